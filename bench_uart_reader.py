@@ -0,0 +1,274 @@
+"""
+bench_uart_reader.py
+--------------------
+Benchmark suite for the uart_reader.py hot path.
+
+  - Per-call cost of hex_dump, bin_dump, ascii_repr, decode_ints,
+    decode_floats, decode_utf8, display_all and verify_frames for packet
+    sizes 1-4096
+  - Whole-pipeline throughput (bytes/s) over a synthetic tm_fast stream,
+    with display off, on, and through a packet schema
+  - Table formatters vs. the original per-byte f-string versions
+
+Results can be written to JSON and compared against a saved baseline; any
+metric that is worse than the baseline by more than the threshold is
+reported and the process exits with status 1.  To keep host load from
+reading as a regression, every run also times a fixed calibration workload
+and baseline values are scaled by how much slower it ran, and a
+flagged metric is re-measured (RECHECKS times) and only reported if it
+regresses every time.
+
+    python bench_uart_reader.py --output baseline.json
+    python bench_uart_reader.py --compare baseline.json --threshold 0.2
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+import timeit
+
+import numpy as np
+
+import uart_reader as ur
+
+# ── Configuration ────────────────────────────────────────────────────────────
+SIZES          = (4, 64, 4096)                        # reference comparison
+SUITE_SIZES    = (1, 4, 16, 64, 256, 1024, 4096)      # hot-path suite
+STREAM_BYTES   = 1 << 20      # synthetic stream for the quiet pipeline run
+DISPLAY_BYTES  = 1 << 14      # smaller stream when display_all is on
+STREAM_CHUNK   = ur.MAX_CHUNK
+WORD_SCHEMA    = ur.PacketSchema([{'name': 'count', 'offset': 0, 'type': 'u8'}],
+                                 size=ur.FRAME_SIZE, name='word')
+THRESHOLD      = 0.20         # default allowed slowdown vs. the baseline
+RECHECKS       = 2            # re-measurements a regression must survive
+RECHECK_BUDGET = 0.2          # per-repeat timing budget when re-measuring
+CALIBRATION    = 'calibration'                         # host-speed reference metric
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+# ── Reference (per-byte f-string) formatters ─────────────────────────────────
+
+def ref_hex_dump(data: bytes) -> str:
+    return ' '.join(f'{b:02X}' for b in data)
+
+
+def ref_bin_dump(data: bytes) -> str:
+    return ' '.join(f'{b:08b}' for b in data)
+
+
+def ref_ascii_repr(data: bytes) -> str:
+    return ''.join(chr(b) if 32 <= b < 127 else '.' for b in data)
+
+
+FORMATTERS = (
+    ('hex_dump',   ref_hex_dump,   ur.hex_dump),
+    ('bin_dump',   ref_bin_dump,   ur.bin_dump),
+    ('ascii_repr', ref_ascii_repr, ur.ascii_repr),
+)
+
+
+def _display(data: bytes) -> None:
+    ur.display_all(data, 1)
+
+
+def _verify(data: bytes) -> None:
+    ur.verify_frames(data, 'compact16')
+
+
+HOT_PATH = (
+    ('hex_dump',      ur.hex_dump),
+    ('bin_dump',      ur.bin_dump),
+    ('ascii_repr',    ur.ascii_repr),
+    ('decode_ints',   ur.decode_ints),
+    ('decode_floats', ur.decode_floats),
+    ('decode_utf8',   ur.decode_utf8),
+    ('display_all',   _display),
+    ('verify_frames', _verify),
+)
+
+
+def per_call_us(func, data: bytes, budget_s: float = 0.05, repeat: int = 5) -> float:
+    """Best-of-`repeat` time per call in microseconds, auto-sizing the loop count."""
+    timer  = timeit.Timer(lambda: func(data))
+    loops, elapsed = timer.autorange()
+    loops  = max(1, int(loops * budget_s / max(elapsed, 1e-9)))
+    best   = min(timer.repeat(repeat=repeat, number=loops))
+    return best / loops * 1e6
+
+
+def calibration_us() -> float:
+    """Per-call time of a fixed workload that never changes with uart_reader."""
+    return per_call_us(ref_hex_dump, bytes(range(256)), budget_s=0.2)
+
+
+def tm_stream(nbytes: int) -> bytes:
+    """Synthetic tm_fast byte stream: consecutive 0x01010101 * value words."""
+    values = np.arange(nbytes // ur.FRAME_SIZE, dtype=np.uint32) & 0xFF
+    return (values * np.uint32(0x01010101)).astype('<u4').tobytes()
+
+
+# ── Suites ───────────────────────────────────────────────────────────────────
+
+def bench_formatters() -> None:
+    print(f"{'formatter':<12}{'size':>6}{'reference':>14}{'table':>12}{'speedup':>10}")
+    for name, ref, new in FORMATTERS:
+        for size in SIZES:
+            data = os.urandom(size)
+            assert ref(data) == new(data), f'{name} output differs at {size} bytes'
+            t_ref = per_call_us(ref, data, budget_s=0.2)
+            t_new = per_call_us(new, data, budget_s=0.2)
+            print(f"{name:<12}{size:>6}{t_ref:>12.2f}us{t_new:>10.2f}us{t_ref / t_new:>9.1f}x")
+
+
+def bench_hot_path(sizes=SUITE_SIZES, keys=None, budget_s: float = 0.05) -> dict:
+    """Per-call cost of every hot-path function (or only `keys`), keyed 'name/size'."""
+    results = {}
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        for name, func in HOT_PATH:
+            for size in sizes:
+                if keys is not None and f'{name}/{size}' not in keys:
+                    continue
+                data = os.urandom(size)
+                results[f'{name}/{size}'] = {
+                    'value':  per_call_us(func, data, budget_s),
+                    'unit':   'us/call',
+                    'better': 'lower',
+                }
+    return results
+
+
+def bench_pipeline(keys=None) -> dict:
+    """Whole-pipeline throughput over a synthetic stream fed in MAX_CHUNK reads."""
+    results = {}
+    runs = (('pipeline/quiet', STREAM_BYTES, False, None),
+            ('pipeline/display', DISPLAY_BYTES, True, None),
+            ('pipeline/schema', DISPLAY_BYTES, True, WORD_SCHEMA))
+
+    with open(os.devnull, 'w') as sink, contextlib.redirect_stdout(sink):
+        for key, nbytes, display, schema in runs:
+            if keys is not None and key not in keys:
+                continue
+            stream = memoryview(tm_stream(nbytes))
+            best   = float('inf')
+            for _ in range(3):
+                pipeline = ur.Pipeline(display=display)
+                pipeline.schema = schema
+                start    = time.perf_counter()
+                for pos in range(0, len(stream), STREAM_CHUNK):
+                    pipeline.feed(stream[pos:pos + STREAM_CHUNK])
+                best = min(best, time.perf_counter() - start)
+            results[key] = {
+                'value':  len(stream) / best,
+                'unit':   'B/s',
+                'better': 'higher',
+            }
+    return results
+
+
+def bench_all(keys=None, budget_s: float = 0.05) -> dict:
+    """Calibration plus every suite metric (or only `keys`)."""
+    results = {CALIBRATION: {
+        'value':  calibration_us(),
+        'unit':   'us/call',
+        'better': 'lower',
+    }}
+    results.update(bench_hot_path(keys=keys, budget_s=budget_s))
+    results.update(bench_pipeline(keys=keys))
+    return results
+
+
+# ── Baseline comparison ──────────────────────────────────────────────────────
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Return (key, baseline, current, change) for every regressed metric.
+
+    When both sides carry a calibration time and this host ran it slower,
+    baseline values are first scaled by that ratio so a busy machine is not
+    mistaken for a code change.  The scale never tightens the baseline: the
+    calibration sample is itself noisy.
+    """
+    speed = 1.0
+    if CALIBRATION in results and baseline.get(CALIBRATION, {}).get('value'):
+        speed = max(1.0, results[CALIBRATION]['value'] / baseline[CALIBRATION]['value'])
+    regressions = []
+    for key, cur in results.items():
+        ref = baseline.get(key)
+        if key == CALIBRATION or ref is None or not ref['value']:
+            continue
+        expect = ref['value'] * speed if cur['better'] == 'lower' else ref['value'] / speed
+        change = cur['value'] / expect - 1.0
+        worse  = change if cur['better'] == 'lower' else -change
+        if worse > threshold:
+            regressions.append((key, expect, cur['value'], change))
+    return regressions
+
+
+def print_results(results: dict) -> None:
+    for key, res in results.items():
+        print(f"  {key:<24}{res['value']:>16,.2f} {res['unit']}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark the uart_reader hot path.')
+    ap.add_argument('--output', metavar='FILE', help='write results as JSON')
+    ap.add_argument('--compare', metavar='FILE', help='baseline JSON to check against')
+    ap.add_argument('--threshold', type=float, default=THRESHOLD,
+                    help=f'allowed relative slowdown (default {THRESHOLD:g})')
+    ap.add_argument('--formatters', action='store_true',
+                    help='only compare table formatters against the per-byte originals')
+    args = ap.parse_args()
+
+    if args.formatters:
+        bench_formatters()
+        return
+
+    results = bench_all()
+    print_results(results)
+
+    if args.output:
+        doc = {
+            'meta': {
+                'python':  platform.python_version(),
+                'numpy':   np.__version__,
+                'machine': platform.machine(),
+                'node':    platform.node(),
+                'time':    time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(doc, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for _ in range(RECHECKS):
+            if not regressions:
+                break
+            # A single sample can land on a busy moment: re-measure just the
+            # flagged metrics over a longer budget and keep only those that
+            # regress again.
+            flagged     = {key for key, *_ in regressions}
+            print(f"Re-measuring {len(flagged)} flagged metric(s)...")
+            again       = compare(bench_all(flagged, budget_s=RECHECK_BUDGET),
+                                  baseline, args.threshold)
+            regressions = [r for r in again if r[0] in flagged]
+        ur.print_separator('═')
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%} vs. {args.compare}")
+            return
+        print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%} vs. {args.compare}"
+              f" (after {RECHECKS} re-checks, calibrated for host speed):")
+        for key, ref, cur, change in regressions:
+            print(f"  {key:<24}{ref:>14,.2f} -> {cur:>14,.2f}  ({change:+.0%})")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+latency_report.py
+-----------------
+Joins the tm_fast sender log with the uart_reader timing log and reports
+end-to-end latency from GPIO edge to decoded frame.
+
+  sender  (tm_fast --timing-log)      : index,line,seq,edge_ns,write_ns
+  reader  (uart_reader --timing-log)  : index,line,seq,arrival_ns,decode_ns
+
+Both sides stamp with CLOCK_MONOTONIC and count index per line (word frames
+are all line 0), so frames are joined on (line, index).  The reader's index
+starts at 0 on the first frame it saw of each line, so each line is aligned
+on its own by choosing the sender offset whose 8-bit sequence matches the
+reader's first frame and whose write time is the latest one not after that
+frame's arrival.  For logs from two different hosts pass --offset-ns
+(sender clock minus reader clock).
+
+Stages reported (p50 / p99 / p99.9 / max):
+
+  edge -> write    : tm_fast wakeup + debounce + write()
+  write -> arrival : UART wire time + kernel + reader read
+  arrival -> decode: frame sync + sequence checks in the reader
+  edge -> decode   : the whole path
+
+    python latency_report.py sender.csv reader.csv
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+SEQ_MOD = 256
+
+
+def load_log(path: str, columns: tuple) -> dict:
+    """Load a timing CSV into {column: int64 array}, checking the header."""
+    with open(path) as f:
+        header = tuple(f.readline().strip().split(','))
+        if header != columns:
+            raise ValueError(f'{path}: expected header {",".join(columns)}, got {",".join(header)}')
+        data = np.loadtxt(f, delimiter=',', dtype=np.int64, ndmin=2)
+    if not data.size:
+        data = np.empty((0, len(columns)), dtype=np.int64)
+    return {name: data[:, i] for i, name in enumerate(columns)}
+
+
+def align(sender: dict, reader: dict) -> int:
+    """Sender index corresponding to reader index 0 (see module docstring)."""
+    seq0     = reader['seq'][0]
+    arrival0 = reader['arrival_ns'][0]
+    matches  = np.flatnonzero((sender['seq'] % SEQ_MOD == seq0 % SEQ_MOD)
+                              & (sender['write_ns'] <= arrival0))
+    if not matches.size:
+        raise ValueError("no sender frame matches the reader's first frame")
+    return int(sender['index'][matches[-1]])
+
+
+def select_line(log: dict, line: int) -> dict:
+    """The rows of one line."""
+    rows = log['line'] == line
+    return {name: column[rows] for name, column in log.items()}
+
+
+def join_line(sender: dict, reader: dict) -> dict:
+    """join() for the rows of a single line."""
+    base   = align(sender, reader)
+    wanted = reader['index'] + base
+    pos    = np.searchsorted(sender['index'], wanted)
+    pos    = np.minimum(pos, len(sender['index']) - 1)
+    hit    = sender['index'][pos] == wanted
+    # Same low 8 bits on both ends guards against a misaligned join (compact
+    # frames log 16- or 32-bit sequence numbers).
+    hit   &= sender['seq'][pos] % SEQ_MOD == reader['seq'] % SEQ_MOD
+
+    return {
+        'edge_ns':    sender['edge_ns'][pos[hit]],
+        'write_ns':   sender['write_ns'][pos[hit]],
+        'arrival_ns': reader['arrival_ns'][hit],
+        'decode_ns':  reader['decode_ns'][hit],
+    }
+
+
+def join(sender: dict, reader: dict) -> dict:
+    """Return per-frame timestamps for frames present in both logs."""
+    parts = [join_line(select_line(sender, line), select_line(reader, line))
+             for line in np.unique(reader['line']) if np.any(sender['line'] == line)]
+    if not parts:
+        raise ValueError('no line appears in both logs')
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+
+def percentiles(values_ns: np.ndarray) -> str:
+    if not values_ns.size:
+        return 'n/a'
+    p50, p99, p999 = np.percentile(values_ns, (50, 99, 99.9)) / 1e3
+    return (f"p50 {p50:>9.1f}  p99 {p99:>9.1f}  p99.9 {p999:>9.1f}  "
+            f"max {values_ns.max() / 1e3:>9.1f}  us")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Edge-to-decode latency from tm_fast + uart_reader logs.')
+    ap.add_argument('sender', help='tm_fast --timing-log output')
+    ap.add_argument('reader', help='uart_reader --timing-log output')
+    ap.add_argument('--offset-ns', type=int, default=0,
+                    help='sender clock minus reader clock, for logs from two hosts')
+    args = ap.parse_args()
+
+    try:
+        sender = load_log(args.sender, ('index', 'line', 'seq', 'edge_ns', 'write_ns'))
+        reader = load_log(args.reader, ('index', 'line', 'seq', 'arrival_ns', 'decode_ns'))
+        if not len(sender['index']) or not len(reader['index']):
+            raise ValueError('empty timing log')
+        sender['edge_ns']  = sender['edge_ns'] - args.offset_ns
+        sender['write_ns'] = sender['write_ns'] - args.offset_ns
+        joined = join(sender, reader)
+    except (OSError, ValueError) as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    matched = len(joined['edge_ns'])
+    print(f"Sender frames : {len(sender['index'])}")
+    print(f"Reader frames : {len(reader['index'])}")
+    print(f"Matched       : {matched}")
+    print('─' * 70)
+    print(f"  edge -> write     : {percentiles(joined['write_ns'] - joined['edge_ns'])}")
+    print(f"  write -> arrival  : {percentiles(joined['arrival_ns'] - joined['write_ns'])}")
+    print(f"  arrival -> decode : {percentiles(joined['decode_ns'] - joined['arrival_ns'])}")
+    print(f"  edge -> decode    : {percentiles(joined['decode_ns'] - joined['edge_ns'])}")
+
+
+if __name__ == '__main__':
+    main()
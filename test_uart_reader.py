@@ -0,0 +1,305 @@
+"""
+test_uart_reader.py
+-------------------
+Regression tests for uart_reader.py.
+
+    python -m pytest -q
+"""
+
+import asyncio
+import binascii
+import math
+import os
+import random
+import re
+import struct
+import time
+
+import numpy as np
+import pytest
+import serial
+
+import uart_reader as ur
+
+UNIVERSAL_NEWLINES = ('\r\n', '\r', '\n')
+
+
+def tm_words(values) -> bytes:
+    """tm_fast word frames (0x01010101 * value) for each value."""
+    return b''.join(bytes([v & 0xFF]) * 4 for v in values)
+
+
+def split_randomly(data: bytes, rnd: random.Random, max_cuts: int = 8) -> list:
+    cuts = sorted(rnd.sample(range(len(data) + 1), min(len(data) + 1, rnd.randint(0, max_cuts))))
+    return [data[i:j] for i, j in zip([0] + cuts, cuts + [len(data)])]
+
+
+def assemble(terminators, chunks) -> list:
+    """Every line a LineAssembler produces for `chunks`, flush included."""
+    text  = ur.LineAssembler(terminators)
+    lines = []
+    for chunk in chunks:
+        lines.extend(text.feed(chunk))
+    return lines + text.flush()
+
+
+# ── Decoding ─────────────────────────────────────────────────────────────────
+
+def test_decode_batch_reads_every_aligned_word():
+    data  = bytes(range(1, 17))
+    words = ur.decode_batch(data, ('uint16_LE', 'int32_BE', 'float64_LE'))
+    assert words['uint16_LE'].tolist() == list(struct.unpack('<8H', data))
+    assert words['int32_BE'].tolist() == list(struct.unpack('>4i', data))
+    assert words['float64_LE'].tolist() == list(struct.unpack('<2d', data))
+    assert 'uint64_LE' not in ur.decode_batch(data[:7])
+
+
+def test_decode_packets_matches_single_packet_decoders():
+    rnd     = random.Random(0)
+    packets = [rnd.randbytes(n) for n in (0, 1, 2, 3, 4, 5, 7, 8, 12, 4, 4)]
+    columns = ur.decode_columns(packets)
+    for k, packet in enumerate(packets):
+        want = {**ur.decode_ints(packet), **ur.decode_floats(packet)}
+        got  = {label: col[k] for label, col in columns.items() if col[k] is not None}
+        assert list(got) == list(want)
+        for label, value in want.items():
+            assert got[label] == value or (math.isnan(value) and math.isnan(got[label]))
+
+
+# ── Frame integrity ──────────────────────────────────────────────────────────
+
+def compact16_frame(line: int, seq: int, dt_us: int) -> bytes:
+    body = ur.COMPACT_STRUCTS['compact16'].pack(0x5AA5, line, 1, seq, dt_us, 0)[:-2]
+    return body + struct.pack('<H', binascii.crc_hqx(body, 0xFFFF))
+
+
+def test_crc16_rows_is_crc16_ccitt_false():
+    check = np.frombuffer(b'123456789', dtype=np.uint8).reshape(1, -1)
+    assert ur.crc16_rows(check).tolist() == [0x29B1]
+    rows = np.random.default_rng(0).integers(0, 256, (50, 10), dtype=np.uint8)
+    assert ur.crc16_rows(rows).tolist() == [binascii.crc_hqx(r.tobytes(), 0xFFFF) for r in rows]
+
+
+def test_verify_frames_counts_bad_sync_and_bad_crc():
+    frames = [bytearray(compact16_frame(k % 3, k, 100 * k)) for k in range(6)]
+    frames[2][6] ^= 0x01                    # payload bit flip: CRC no longer matches
+    frames[4][0]  = 0x00                    # sync marker lost
+    good, bad_sync, bad_crc = ur.verify_frames(b''.join(frames) + b'\xA5', 'compact16')
+    assert good.tolist() == [True, True, False, True, False, True]
+    assert (bad_sync, bad_crc) == (1, 1)
+
+
+# ── FrameSync ────────────────────────────────────────────────────────────────
+
+def sync_all(chunks) -> tuple:
+    sync   = ur.FrameSync()
+    frames = [bytes(frame) for chunk in chunks for frame in sync.feed(chunk)]
+    return frames, sync.resyncs, sync.slipped
+
+
+def test_frame_sync_locks_past_leading_garbage_and_resyncs():
+    stream = b'\x01\x02\x03' + tm_words(range(5)) + b'\xEE' + tm_words(range(5, 10))
+    frames, resyncs, slipped = sync_all([stream])
+    assert frames == [tm_words([v]) for v in range(10)]
+    assert resyncs == 1
+    assert slipped == 3 + 1
+
+
+def test_frame_sync_does_not_depend_on_read_boundaries():
+    rnd = random.Random(0)
+    for _ in range(300):
+        parts = []
+        for _ in range(rnd.randint(1, 6)):
+            parts.append(tm_words(rnd.randrange(256) for _ in range(rnd.randint(0, 12))))
+            parts.append(rnd.randbytes(rnd.randint(0, 3)))
+        stream = b''.join(parts)
+        assert sync_all(split_randomly(stream, rnd)) == sync_all([stream])
+
+
+# ── SequenceTracker ──────────────────────────────────────────────────────────
+
+def test_sequence_tracker_counts_gaps_duplicates_and_wraps():
+    seq  = ur.SequenceTracker(256)
+    gaps = [seq.update(v) for v in (250, 251, 251, 254, 255, 0, 3)]
+    assert gaps == [0, 0, 0, 2, 0, 0, 2]
+    assert (seq.received, seq.dropped, seq.duplicates, seq.wraps) == (7, 4, 1, 1)
+    assert seq.longest_gap == 2
+    assert seq.index == 9                   # 250 -> 3 unwrapped
+    assert seq.loss_rate == pytest.approx(4 / 10)
+
+
+# ── Capture files ────────────────────────────────────────────────────────────
+
+def test_capture_round_trip(tmp_path):
+    path   = str(tmp_path / 'run.cap')
+    chunks = [b'abc', b'', bytearray(b'\x00' * 5000), memoryview(b'xyz')]
+    writer = ur.CaptureWriter(path, fsync='block', block=64)
+    for ts, chunk in enumerate(chunks):
+        writer.append(chunk, ts_ns=1000 + ts)
+    writer.close()
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    want = [(1000 + ts, bytes(chunk)) for ts, chunk in enumerate(chunks)]
+    assert [(ts, bytes(p)) for ts, p in ur.iter_capture(data)] == want
+    # A record cut short by a killed recorder is dropped, not misread.
+    assert [(ts, bytes(p)) for ts, p in ur.iter_capture(data[:-1])] == want[:-1]
+    with pytest.raises(ValueError):
+        list(ur.iter_capture(b'not a capture'))
+
+
+def test_capture_writer_refuses_non_empty_files(tmp_path):
+    capture = str(tmp_path / 'old.cap')
+    ur.CaptureWriter(capture).close()
+    foreign = tmp_path / 'notes.txt'
+    foreign.write_text('hello\n')
+    for path in (capture, str(foreign)):
+        before = open(path, 'rb').read()
+        with pytest.raises(ValueError):
+            ur.CaptureWriter(path)
+        assert open(path, 'rb').read() == before
+
+
+def test_capture_writer_raises_write_errors(tmp_path):
+    writer = ur.CaptureWriter(str(tmp_path / 'full.cap'), block=16)
+    os.dup2(os.open('/dev/full', os.O_WRONLY), writer.fd)
+    with pytest.raises(ur.CaptureError):
+        for _ in range(5000):
+            writer.append(b'x' * 16)
+            time.sleep(0.001)
+    assert 'FAILED' in writer.summary()
+    writer.close()                          # already reported: closes quietly
+
+
+# ── PacketSchema ─────────────────────────────────────────────────────────────
+
+def test_schema_unpack_and_decode_agree():
+    schema = ur.PacketSchema([
+        {'name': 'kind', 'offset': 0, 'type': 'u8'},
+        {'name': 'temp', 'offset': 2, 'type': 'i16', 'scale': 0.5, 'bias': -10},
+        {'name': 'count', 'offset': 4, 'type': 'u32', 'endian': 'big'},
+    ], size=8)
+    assert schema.struct is None            # mixed byte orders
+    frames = [struct.pack('<Bxh', 7, -4) + struct.pack('>I', 70000) + b'\0\0', bytes(8)]
+    assert schema.unpack(frames[0]) == {'kind': 7, 'temp': -12.0, 'count': 70000}
+    cols = schema.decode(b''.join(frames))
+    assert cols['kind'].tolist() == [7, 0]
+    assert cols['temp'].tolist() == [-12.0, -10.0]
+    assert cols['count'].tolist() == [70000, 0]
+
+
+def test_schema_rejects_bad_layouts():
+    with pytest.raises(ValueError):
+        ur.PacketSchema([{'name': 'a', 'offset': 0, 'type': 'u16'},
+                         {'name': 'b', 'offset': 1, 'type': 'u8'}])
+    with pytest.raises(ValueError):
+        ur.PacketSchema([{'name': 'a', 'offset': 0, 'type': 'u24'}])
+    with pytest.raises(ValueError):
+        ur.PacketSchema([{'name': 'a', 'offset': 0, 'type': 'u32'}], size=2)
+
+
+# ── LineAssembler ────────────────────────────────────────────────────────────
+
+def test_crlf_split_across_reads_with_overlapping_terminators():
+    assert assemble(UNIVERSAL_NEWLINES, [b'a\r', b'\nb\n']) == ['a', 'b']
+    assert assemble(UNIVERSAL_NEWLINES, [b'a\r\nb\n']) == ['a', 'b']
+    assert assemble(UNIVERSAL_NEWLINES, [b'a\r', b'b\r', b'\r', b'\n']) == ['a', 'b', '']
+
+
+def test_lines_do_not_depend_on_read_boundaries():
+    rnd    = random.Random(0)
+    tokens = ['a', 'é', '€', '\r', '\n', '\r\n', 'E', 'N', 'D']
+    for terminators in (('\n',), ('\r\n',), UNIVERSAL_NEWLINES, ('END', 'E', '\n')):
+        split = re.compile('|'.join(map(re.escape, sorted(terminators, key=len, reverse=True))))
+        for _ in range(2000):
+            text = ''.join(rnd.choice(tokens) for _ in range(rnd.randint(0, 24)))
+            want = split.split(text)
+            if not want[-1]:
+                want.pop()
+            chunks = split_randomly(text.encode(), rnd, max_cuts=5)
+            assert assemble(terminators, chunks) == want, (terminators, text, chunks)
+
+
+def test_terminator_escapes_keep_non_ascii_text():
+    args = ur.parse_args(['--text', '--terminator', r'\r\n', '--terminator', '€',
+                          '--terminator', r'é\t', '--terminator', r'\u20ac!'])
+    assert args.terminator == ['\r\n', '€', 'é\t', '€!']
+    assert assemble(args.terminator, ['a€bé\tc\r\n'.encode()]) == ['a', 'b', 'c']
+
+
+# ── TelemetryStore ───────────────────────────────────────────────────────────
+
+def test_query_finds_equal_timestamps_across_a_chunk_boundary():
+    store = ur.TelemetryStore({'ts_ns': np.int64, 'v': np.int32}, chunk_rows=4)
+    store.append({'ts_ns': np.array([0, 0, 100]), 'v': np.array([1, 2, 3])})
+    store.append({'ts_ns': np.array([100, 100, 100]), 'v': np.array([4, 5, 6])})   # splits
+    store.append({'ts_ns': np.array([300]), 'v': np.array([7])})
+    assert store.query(100, 300)['v'].tolist() == [3, 4, 5, 6]
+    assert store.at(100)['v'] == 6
+
+
+def test_spill_directory_holds_one_run(tmp_path):
+    spill = str(tmp_path)
+    store = ur.TelemetryStore({'ts_ns': np.int64}, chunk_rows=2, max_chunks=1, spill_dir=spill)
+    store.append({'ts_ns': np.arange(6)})
+    store.close()
+    with pytest.raises(ValueError):
+        ur.TelemetryStore({'ts_ns': np.int64}, spill_dir=spill)
+    assert ur.TelemetryStore.open(spill).query(0, 10)['ts_ns'].tolist() == list(range(6))
+
+    os.rename(os.path.join(spill, 'chunk_000000'), os.path.join(spill, 'chunk_000009'))
+    with pytest.raises(ValueError):
+        ur.TelemetryStore.open(spill)
+
+
+def test_store_takes_schema_line_field():
+    here   = os.path.dirname(os.path.abspath(__file__))
+    schema = ur.PacketSchema.load(os.path.join(here, 'compact16.schema.json'))
+    store  = ur.TelemetryStore.for_schema(schema)
+    assert list(store.columns)[:3] == ['ts_ns', 'line', 'index']
+    assert set(schema.names) <= set(store.columns)
+
+
+
+def test_store_needs_a_spill_directory(tmp_path, capsys):
+    with pytest.raises(SystemExit):
+        ur.parse_args(['--store'])
+    assert '--spill' in capsys.readouterr().err
+    assert ur.parse_args(['--spill', str(tmp_path / 'run')]).store
+
+# ── Readers ──────────────────────────────────────────────────────────────────
+
+class HungUpPort:
+    """A 'port' whose fd holds `data` and then reads as end-of-file, like a
+    USB adapter pulled out while the reader is running."""
+
+    in_waiting = 0
+
+    def __init__(self, data: bytes):
+        self.fd, w = os.pipe()
+        os.write(w, data)
+        os.close(w)
+
+    def fileno(self) -> int:
+        return self.fd
+
+
+READERS = {
+    'poll':     ur.poll_reader,
+    'adaptive': ur.adaptive_reader,
+    'async':    lambda ser, pipeline: asyncio.run(ur.async_reader(ser, pipeline)),
+    'thread':   ur.thread_reader,
+    'farm':     lambda ser, pipeline: ur.farm_reader(ser, pipeline, 1),
+}
+
+
+@pytest.mark.parametrize('mode', READERS)
+def test_readers_raise_on_disconnect_after_feeding_what_arrived(mode):
+    port     = HungUpPort(tm_words(range(3)))
+    pipeline = ur.Pipeline(display=False)
+    try:
+        with pytest.raises(serial.SerialException, match='returned no data'):
+            READERS[mode](port, pipeline)
+    finally:
+        os.close(port.fd)
+    assert pipeline.sync.frames == 3
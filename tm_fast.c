@@ -1,6 +1,10 @@
 #define _GNU_SOURCE
 #include <stdio.h>
 #include <stdint.h>
+#include <stdlib.h>
+#include <signal.h>
+#include <errno.h>
+#include <getopt.h>
 #include <unistd.h>
 #include <fcntl.h>
 #include <termios.h>
@@ -10,17 +14,531 @@
 #include <gpiod.h>
 #include <time.h>
 
+// Compile-time defaults; every one can be overridden at run time from a
+// config file (--config) or the command line, in that order.
 #define UART_DEVICE "/dev/ttyAMA0"
-#define BAUDRATE B921600
+#define BAUDRATE 921600
 
 #define GPIO_CHIP "/dev/gpiochip0"
 #define GPIO_LINE 23
+#define MAX_LINES 8         // GPIO lines in one request (--line 23,24,...)
 
 #define MIN_PERIOD_US 150   // Ignore edges faster than this
+#define RT_PRIORITY 80      // SCHED_FIFO priority, 0 keeps SCHED_OTHER
+#define EVENT_BUF 16        // Edge events read per wakeup
+
+// TX batching: queue frames and write() them once TX_BYTES are pending or the
+// oldest has waited TX_DEADLINE_US.  TX_BYTES 0 writes every submit through.
+#define TX_BYTES 0
+#define TX_DEADLINE_US 500
+#define TX_MAX_FRAMES 256
+
+// Frame formats (bytes in wire order, multi-byte fields little-endian):
+//   word      : v, v, v, v               v = 8-bit counter (0x01010101 * v)
+//   tagged    : 0xA0|ch, seq, ~(0xA0|ch), ~seq
+//   compact16 : A5 5A, ch, kind, seq:u16, dt_us:u32, crc:u16     (12 bytes)
+//   compact32 : A5 5A, ch, kind, seq:u32, dt_us:u32, crc:u16     (14 bytes)
+// ch is the index of the line in --line and seq that line's own counter.
+// kind is the gpiod edge event type (1 rising, 2 falling); dt_us is the
+// kernel-timestamp interval since the line's previous accepted edge (0 for
+// the first, saturating); crc is CRC-16/CCITT-FALSE over the bytes before it.
+// More than one line requires a format that carries ch.
+enum frame_format {
+    FORMAT_AUTO = -1, FORMAT_WORD, FORMAT_TAGGED, FORMAT_COMPACT16, FORMAT_COMPACT32
+};
+static const char *const format_names[] = { "word", "tagged", "compact16", "compact32" };
+#define TAG_MARK 0xA0
+#define SYNC_0 0xA5
+#define SYNC_1 0x5A
+#define FRAME_MAX 14
+
+struct config {
+    char device[128];
+    unsigned int baud;
+    char chip[128];
+    unsigned int lines[MAX_LINES];
+    int num_lines;
+    int format;
+    unsigned int min_period_us;
+    int priority;
+    int cpu;                    // CPU to pin to, -1 leaves affinity alone
+    // --batch: one frame per accepted edge in the event buffer (debounced on
+    // each event's kernel timestamp), sent with one write() per wakeup.
+    // Otherwise one word is sent per wakeup, however many edges it carried.
+    int batch;
+    // --timing-log: "index,line,seq,edge_ns,write_ns" (CLOCK_MONOTONIC) for
+    // every frame sent, index counting that line's frames; latency_report.py
+    // joins it with uart_reader's log on (line, index).
+    char timing_log[256];
+    long tx_bytes;
+    long tx_deadline_us;
+};
+
+static struct config cfg = {
+    .device = UART_DEVICE,
+    .baud = BAUDRATE,
+    .chip = GPIO_CHIP,
+    .lines = { GPIO_LINE },
+    .num_lines = 1,
+    .format = FORMAT_AUTO,
+    .min_period_us = MIN_PERIOD_US,
+    .priority = RT_PRIORITY,
+    .cpu = -1,
+    .tx_bytes = TX_BYTES,
+    .tx_deadline_us = TX_DEADLINE_US,
+};
+
+static volatile sig_atomic_t stop = 0;
+
+static void on_signal(int sig)
+{
+    (void)sig;
+    stop = 1;
+}
+
+static uint64_t monotonic_ns(void)
+{
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec * 1000000000ULL + ts.tv_nsec;
+}
+
+struct tx_queue {
+    int fd;
+    FILE *timing;
+    size_t threshold;           // bytes that trigger a flush (0: write-through)
+    uint64_t deadline_ns;       // max time a frame may sit in the queue
+    size_t frame_size;
+
+    uint8_t bytes[TX_MAX_FRAMES * FRAME_MAX];
+    uint64_t edges[TX_MAX_FRAMES];
+    uint32_t seqs[TX_MAX_FRAMES];
+    uint8_t chans[TX_MAX_FRAMES];
+    uint64_t line_index[MAX_LINES]; // per-line emission index of the next frame
+    size_t count;               // frames queued
+    uint64_t oldest_ns;         // when the first queued frame was queued
+
+    uint64_t submits;           // write() calls an unbuffered sender would make
+    uint64_t writes;            // write() calls actually made
+    uint64_t max_delay_ns;
+};
+
+static void tx_flush(struct tx_queue *tx)
+{
+    if (!tx->count)
+        return;
+
+    write(tx->fd, tx->bytes, tx->count * tx->frame_size);
+
+    uint64_t now = monotonic_ns();
+    if (now - tx->oldest_ns > tx->max_delay_ns)
+        tx->max_delay_ns = now - tx->oldest_ns;
+
+    if (tx->timing) {
+        for (size_t i = 0; i < tx->count; i++) {
+            uint64_t index = tx->line_index[tx->chans[i]]++;
+            fprintf(tx->timing, "%llu,%u,%u,%llu,%llu\n",
+                    (unsigned long long)index, tx->chans[i], tx->seqs[i],
+                    (unsigned long long)tx->edges[i],
+                    (unsigned long long)now);
+        }
+    }
+
+    tx->count = 0;
+    tx->writes++;
+}
+
+// Queue n encoded frames (one unbuffered write's worth) with their edge
+// timestamps, channels and sequence numbers.
+static void tx_submit(struct tx_queue *tx, const uint8_t *frames,
+                      const uint64_t *edges, const uint8_t *chans,
+                      const uint32_t *seqs, int n)
+{
+    tx->submits++;
+
+    for (int i = 0; i < n; i++) {
+        if (tx->count == TX_MAX_FRAMES)
+            tx_flush(tx);
+        if (!tx->count)
+            tx->oldest_ns = monotonic_ns();
+        memcpy(tx->bytes + tx->count * tx->frame_size,
+               frames + i * tx->frame_size, tx->frame_size);
+        tx->edges[tx->count] = edges[i];
+        tx->seqs[tx->count] = seqs[i];
+        tx->chans[tx->count] = chans[i];
+        tx->count++;
+    }
+
+    if (tx->count * tx->frame_size >= tx->threshold)
+        tx_flush(tx);
+}
+
+// Flush if the oldest queued frame has reached its deadline.
+static void tx_poll(struct tx_queue *tx)
+{
+    if (tx->count && monotonic_ns() - tx->oldest_ns >= tx->deadline_ns)
+        tx_flush(tx);
+}
+
+// Nanoseconds until the queue's deadline, or -1 (wait forever) when empty.
+static int64_t tx_timeout_ns(const struct tx_queue *tx)
+{
+    if (!tx->count)
+        return -1;
+
+    uint64_t due = tx->oldest_ns + tx->deadline_ns;
+    uint64_t now = monotonic_ns();
+    return due > now ? (int64_t)(due - now) : 0;
+}
+
+static const struct option long_options[] = {
+    { "config",         required_argument, NULL, 'c' },
+    { "device",         required_argument, NULL, 'd' },
+    { "baud",           required_argument, NULL, 'b' },
+    { "chip",           required_argument, NULL, 'g' },
+    { "line",           required_argument, NULL, 'l' },
+    { "format",         required_argument, NULL, 'f' },
+    { "debounce-us",    required_argument, NULL, 'm' },
+    { "priority",       required_argument, NULL, 'p' },
+    { "cpu",            required_argument, NULL, 'a' },
+    { "batch",          optional_argument, NULL, 'B' },
+    { "timing-log",     required_argument, NULL, 't' },
+    { "tx-bytes",       required_argument, NULL, 'x' },
+    { "tx-deadline-us", required_argument, NULL, 'D' },
+    { "help",           no_argument,       NULL, 'h' },
+    { NULL, 0, NULL, 0 }
+};
+
+static void usage(FILE *out)
+{
+    fprintf(out,
+        "usage: tm_fast [options]\n"
+        "  -c, --config FILE        read key = value options from FILE first\n"
+        "  -d, --device PATH        UART device (" UART_DEVICE ")\n"
+        "  -b, --baud N             baud rate (%d)\n"
+        "  -g, --chip PATH          GPIO chip (" GPIO_CHIP ")\n"
+        "  -l, --line N[,N...]      GPIO line offset(s), up to %d (%d)\n"
+        "  -f, --format FMT         word, tagged, compact16 or compact32\n"
+        "                           (word for one line, tagged for several)\n"
+        "  -m, --debounce-us N      ignore edges closer than N us (%d)\n"
+        "  -p, --priority N         SCHED_FIFO priority, 0 = none (%d)\n"
+        "  -a, --cpu N              pin to CPU N (not pinned)\n"
+        "  -B, --batch[=0|1]        one frame per debounced edge event\n"
+        "  -t, --timing-log FILE    log index,line,seq,edge_ns,write_ns per frame\n"
+        "  -x, --tx-bytes N         queue frames until N bytes are pending (%d)\n"
+        "  -D, --tx-deadline-us N   ...or the oldest has waited N us (%d)\n"
+        "Config file keys are the long option names without dashes in front.\n",
+        BAUDRATE, MAX_LINES, GPIO_LINE, MIN_PERIOD_US, RT_PRIORITY, TX_BYTES, TX_DEADLINE_US);
+}
+
+static int parse_long(const char *name, const char *text, long min, long max, long *out)
+{
+    char *end;
+    errno = 0;
+    long value = strtol(text, &end, 10);
+    if (errno || end == text || *end || value < min || value > max) {
+        fprintf(stderr, "tm_fast: invalid value for --%s: '%s'\n", name, text);
+        return -1;
+    }
+    *out = value;
+    return 0;
+}
+
+static speed_t baud_constant(unsigned int baud)
+{
+    switch (baud) {
+    case 9600:    return B9600;
+    case 19200:   return B19200;
+    case 38400:   return B38400;
+    case 57600:   return B57600;
+    case 115200:  return B115200;
+    case 230400:  return B230400;
+    case 460800:  return B460800;
+    case 500000:  return B500000;
+    case 576000:  return B576000;
+    case 921600:  return B921600;
+    case 1000000: return B1000000;
+    case 1500000: return B1500000;
+    case 2000000: return B2000000;
+    case 3000000: return B3000000;
+    default:      return 0;
+    }
+}
+
+static const char *option_name(int key)
+{
+    for (const struct option *opt = long_options; opt->name; opt++)
+        if (opt->val == key)
+            return opt->name;
+    return "?";
+}
+
+// Apply one option (short-option key) to cfg; 0 on success, -1 on error.
+static int apply_option(int key, const char *value)
+{
+    const char *name = option_name(key);
+    long n;
+
+    switch (key) {
+    case 'd':
+        snprintf(cfg.device, sizeof cfg.device, "%s", value);
+        return 0;
+    case 'b':
+        if (parse_long(name, value, 1, 4000000, &n) < 0)
+            return -1;
+        if (!baud_constant(n)) {
+            fprintf(stderr, "tm_fast: unsupported baud rate %ld\n", n);
+            return -1;
+        }
+        cfg.baud = n;
+        return 0;
+    case 'g':
+        snprintf(cfg.chip, sizeof cfg.chip, "%s", value);
+        return 0;
+    case 'l': {
+        char list[256];
+        snprintf(list, sizeof list, "%s", value);
+        cfg.num_lines = 0;
+        for (char *item = strtok(list, ","); item; item = strtok(NULL, ",")) {
+            if (cfg.num_lines == MAX_LINES) {
+                fprintf(stderr, "tm_fast: at most %d lines\n", MAX_LINES);
+                return -1;
+            }
+            if (parse_long(name, item, 0, 1023, &n) < 0)
+                return -1;
+            cfg.lines[cfg.num_lines++] = n;
+        }
+        if (!cfg.num_lines) {
+            fprintf(stderr, "tm_fast: --line needs at least one offset\n");
+            return -1;
+        }
+        return 0;
+    }
+    case 'f':
+        for (int f = FORMAT_WORD; f <= FORMAT_COMPACT32; f++) {
+            if (!strcmp(value, format_names[f])) {
+                cfg.format = f;
+                return 0;
+            }
+        }
+        fprintf(stderr, "tm_fast: unknown frame format '%s'\n", value);
+        return -1;
+    case 'm':
+        if (parse_long(name, value, 0, 10000000, &n) < 0)
+            return -1;
+        cfg.min_period_us = n;
+        return 0;
+    case 'p':
+        if (parse_long(name, value, 0, 99, &n) < 0)
+            return -1;
+        cfg.priority = n;
+        return 0;
+    case 'a':
+        if (parse_long(name, value, -1, CPU_SETSIZE - 1, &n) < 0)
+            return -1;
+        cfg.cpu = n;
+        return 0;
+    case 'B':
+        if (!value) {
+            cfg.batch = 1;
+            return 0;
+        }
+        if (parse_long(name, value, 0, 1, &n) < 0)
+            return -1;
+        cfg.batch = n;
+        return 0;
+    case 't':
+        snprintf(cfg.timing_log, sizeof cfg.timing_log, "%s", value);
+        return 0;
+    case 'x':
+        if (parse_long(name, value, 0, TX_MAX_FRAMES * FRAME_MAX, &n) < 0)
+            return -1;
+        cfg.tx_bytes = n;
+        return 0;
+    case 'D':
+        if (parse_long(name, value, 0, 10000000, &n) < 0)
+            return -1;
+        cfg.tx_deadline_us = n;
+        return 0;
+    }
+    return -1;
+}
+
+// Read "key = value" lines ('#' starts a comment) from a config file.
+static int load_config(const char *path)
+{
+    FILE *f = fopen(path, "r");
+    if (!f) {
+        perror(path);
+        return -1;
+    }
+
+    char line[512];
+    int lineno = 0, rc = 0;
+
+    while (fgets(line, sizeof line, f)) {
+        lineno++;
+        line[strcspn(line, "#\r\n")] = '\0';
+
+        char key[64], value[256];
+        int fields = sscanf(line, " %63[^= \t] = %255[^\n]", key, value);
+        if (fields <= 0)
+            continue;           // blank or comment-only line
+
+        // Trim trailing blanks from the value.
+        size_t len = fields == 2 ? strlen(value) : 0;
+        while (len && (value[len - 1] == ' ' || value[len - 1] == '\t'))
+            value[--len] = '\0';
+
+        const struct option *opt = long_options;
+        while (opt->name && strcmp(opt->name, key))
+            opt++;
+
+        if (!opt->name || opt->val == 'c' || opt->val == 'h' || fields != 2) {
+            fprintf(stderr, "%s:%d: bad option '%s'\n", path, lineno, key);
+            rc = -1;
+            continue;
+        }
+        if (apply_option(opt->val, value) < 0)
+            rc = -1;
+    }
+
+    fclose(f);
+    return rc;
+}
+
+static int parse_args(int argc, char **argv)
+{
+    const char *short_options = "c:d:b:g:l:f:m:p:a:B::t:x:D:h";
+    int key;
+
+    // First pass: only --config, so the command line overrides the file.
+    opterr = 0;
+    while ((key = getopt_long(argc, argv, short_options, long_options, NULL)) != -1)
+        if (key == 'c' && load_config(optarg) < 0)
+            return -1;
+
+    opterr = 1;
+    optind = 0;                 // glibc: full rescan of argv
+    while ((key = getopt_long(argc, argv, short_options, long_options, NULL)) != -1) {
+        switch (key) {
+        case 'c':
+            break;
+        case 'h':
+            usage(stdout);
+            exit(0);
+        case '?':
+            usage(stderr);
+            return -1;
+        default:
+            if (apply_option(key, optarg) < 0)
+                return -1;
+        }
+    }
+
+    if (optind < argc) {
+        fprintf(stderr, "tm_fast: unexpected argument '%s'\n", argv[optind]);
+        return -1;
+    }
+
+    if (cfg.format == FORMAT_AUTO)
+        cfg.format = cfg.num_lines > 1 ? FORMAT_TAGGED : FORMAT_WORD;
+    if (cfg.format == FORMAT_WORD && cfg.num_lines > 1) {
+        fprintf(stderr, "tm_fast: word frames carry no line id; use --format tagged or compact16\n");
+        return -1;
+    }
+    return 0;
+}
+
+// Channel (index into cfg.lines) of a GPIO line offset, or -1.
+static int channel_of(unsigned int offset)
+{
+    for (int ch = 0; ch < cfg.num_lines; ch++)
+        if (cfg.lines[ch] == offset)
+            return ch;
+    return -1;
+}
+
+static size_t frame_size(void)
+{
+    switch (cfg.format) {
+    case FORMAT_COMPACT16: return 12;
+    case FORMAT_COMPACT32: return 14;
+    default:               return 4;
+    }
+}
+
+// Largest sequence number the frame format carries; counters wrap past it.
+static uint32_t seq_mask(void)
+{
+    switch (cfg.format) {
+    case FORMAT_COMPACT16: return 0xFFFF;
+    case FORMAT_COMPACT32: return 0xFFFFFFFF;
+    default:               return 0xFF;
+    }
+}
+
+// CRC-16/CCITT-FALSE (poly 0x1021, init 0xFFFF), one table lookup per byte.
+static uint16_t crc16_table[256];
+
+static void crc16_init(void)
+{
+    for (int i = 0; i < 256; i++) {
+        uint16_t crc = i << 8;
+        for (int bit = 0; bit < 8; bit++)
+            crc = crc & 0x8000 ? (crc << 1) ^ 0x1021 : crc << 1;
+        crc16_table[i] = crc;
+    }
+}
+
+static uint16_t crc16(const uint8_t *data, size_t len)
+{
+    uint16_t crc = 0xFFFF;
+    while (len--)
+        crc = (crc << 8) ^ crc16_table[(crc >> 8) ^ *data++];
+    return crc;
+}
+
+static size_t put_le(uint8_t *out, uint32_t value, size_t len)
+{
+    for (size_t i = 0; i < len; i++)
+        out[i] = value >> (8 * i);
+    return len;
+}
+
+// Encode one frame for channel ch into out (frame_size() bytes).
+static void encode_frame(uint8_t *out, int ch, uint32_t seq, int kind, uint64_t dt_ns)
+{
+    size_t n = 0;
+
+    switch (cfg.format) {
+    case FORMAT_WORD:
+        memset(out, (uint8_t)seq, 4);
+        return;
+    case FORMAT_TAGGED:
+        out[0] = TAG_MARK | ch;
+        out[1] = seq;
+        out[2] = ~out[0];
+        out[3] = ~out[1];
+        return;
+    }
+
+    uint64_t dt_us = dt_ns / 1000;
+    if (dt_us > UINT32_MAX)
+        dt_us = UINT32_MAX;
+
+    out[n++] = SYNC_0;
+    out[n++] = SYNC_1;
+    out[n++] = ch;
+    out[n++] = kind;
+    n += put_le(out + n, seq, cfg.format == FORMAT_COMPACT32 ? 4 : 2);
+    n += put_le(out + n, dt_us, 4);
+    put_le(out + n, crc16(out, n), 2);
+}
 
 int setup_uart()
 {
-    int fd = open(UART_DEVICE, O_RDWR | O_NOCTTY | O_SYNC);
+    int fd = open(cfg.device, O_RDWR | O_NOCTTY | O_SYNC);
     if (fd < 0) {
         perror("UART open failed");
         return -1;
@@ -29,8 +547,8 @@ int setup_uart()
     struct termios tty;
     tcgetattr(fd, &tty);
 
-    cfsetospeed(&tty, BAUDRATE);
-    cfsetispeed(&tty, BAUDRATE);
+    cfsetospeed(&tty, baud_constant(cfg.baud));
+    cfsetispeed(&tty, baud_constant(cfg.baud));
 
     tty.c_cflag = (tty.c_cflag & ~CSIZE) | CS8;
     tty.c_cflag |= (CLOCAL | CREAD);
@@ -45,48 +563,135 @@ int setup_uart()
     return fd;
 }
 
-int main()
+int main(int argc, char **argv)
 {
+    if (parse_args(argc, argv) < 0)
+        return 2;
+
     mlockall(MCL_CURRENT | MCL_FUTURE);
 
-    struct sched_param sp = { .sched_priority = 80 };
-    sched_setscheduler(0, SCHED_FIFO, &sp);
+    if (cfg.priority > 0) {
+        struct sched_param sp = { .sched_priority = cfg.priority };
+        if (sched_setscheduler(0, SCHED_FIFO, &sp) < 0)
+            perror("SCHED_FIFO");
+    }
+
+    if (cfg.cpu >= 0) {
+        cpu_set_t cpus;
+        CPU_ZERO(&cpus);
+        CPU_SET(cfg.cpu, &cpus);
+        if (sched_setaffinity(0, sizeof cpus, &cpus) < 0)
+            perror("CPU affinity");
+    }
 
     int uart = setup_uart();
     if (uart < 0) return 1;
 
-    struct gpiod_chip *chip = gpiod_chip_open(GPIO_CHIP);
+    FILE *timing = NULL;
+    if (cfg.timing_log[0]) {
+        timing = fopen(cfg.timing_log, "w");
+        if (!timing) {
+            perror("timing log open failed");
+            return 1;
+        }
+        setvbuf(timing, NULL, _IOFBF, 1 << 20);
+        fprintf(timing, "index,line,seq,edge_ns,write_ns\n");
+    }
+
+    crc16_init();
+
+    struct tx_queue tx = {
+        .fd = uart,
+        .timing = timing,
+        .threshold = cfg.tx_bytes,
+        .deadline_ns = cfg.tx_deadline_us * 1000ULL,
+        .frame_size = frame_size(),
+    };
+
+    // No SA_RESTART: a signal interrupts the edge wait so the loop can
+    // exit and flush the timing log.
+    struct sigaction sa = { .sa_handler = on_signal };
+    sigaction(SIGINT, &sa, NULL);
+    sigaction(SIGTERM, &sa, NULL);
+
+    struct gpiod_chip *chip = gpiod_chip_open(cfg.chip);
+    if (!chip) {
+        perror(cfg.chip);
+        return 1;
+    }
 
     struct gpiod_line_settings *settings = gpiod_line_settings_new();
     gpiod_line_settings_set_direction(settings, GPIOD_LINE_DIRECTION_INPUT);
     gpiod_line_settings_set_edge_detection(
         settings, GPIOD_LINE_EDGE_RISING);
+    gpiod_line_settings_set_event_clock(
+        settings, GPIOD_LINE_CLOCK_MONOTONIC);
 
     struct gpiod_line_config *line_cfg = gpiod_line_config_new();
-    unsigned int offset = GPIO_LINE;
-    gpiod_line_config_add_line_settings(line_cfg, &offset, 1, settings);
+    gpiod_line_config_add_line_settings(
+        line_cfg, cfg.lines, cfg.num_lines, settings);
 
     struct gpiod_request_config *req_cfg = gpiod_request_config_new();
     gpiod_request_config_set_consumer(req_cfg, "pulse_uart_tx");
 
     struct gpiod_line_request *request =
         gpiod_chip_request_lines(chip, req_cfg, line_cfg);
+    if (!request) {
+        perror("GPIO line request failed");
+        return 1;
+    }
 
     struct gpiod_edge_event_buffer *buffer =
-        gpiod_edge_event_buffer_new(16);
-
-    uint8_t value = 0;
+        gpiod_edge_event_buffer_new(EVENT_BUF);
 
     struct timespec last = {0};
+    uint64_t last_edge_ns[MAX_LINES] = {0};
+    uint32_t line_seq[MAX_LINES] = {0};   // word format: line 0's is the counter
+    uint32_t mask = seq_mask();
+    size_t size = frame_size();
+    uint8_t frames[EVENT_BUF * FRAME_MAX];
+    uint64_t edges[EVENT_BUF];
+    uint8_t chans[EVENT_BUF];
+    uint32_t seqs[EVENT_BUF];
 
-    while (1)
+    while (!stop)
     {
-        if (gpiod_line_request_wait_edge_events(request, -1) > 0)
+        if (gpiod_line_request_wait_edge_events(request, tx_timeout_ns(&tx)) > 0)
         {
             int events =
-                gpiod_line_request_read_edge_events(request, buffer, 16);
+                gpiod_line_request_read_edge_events(request, buffer, EVENT_BUF);
+
+            // Formats other than word always take the per-event path: each
+            // line is debounced on its own and every accepted edge is sent.
+            if (events > 0 && (cfg.batch || cfg.format != FORMAT_WORD))
+            {
+                int n = 0;
+
+                for (int i = 0; i < events; i++) {
+                    struct gpiod_edge_event *event =
+                        gpiod_edge_event_buffer_get_event(buffer, i);
+                    uint64_t ts = gpiod_edge_event_get_timestamp_ns(event);
+                    int ch = channel_of(gpiod_edge_event_get_line_offset(event));
+
+                    if (ch < 0 ||
+                        ts - last_edge_ns[ch] <= cfg.min_period_us * 1000ULL)
+                        continue;
+
+                    encode_frame(frames + n * size, ch, line_seq[ch],
+                                 gpiod_edge_event_get_event_type(event),
+                                 last_edge_ns[ch] ? ts - last_edge_ns[ch] : 0);
+                    edges[n] = ts;
+                    chans[n] = ch;
+                    seqs[n] = line_seq[ch];
+                    line_seq[ch] = (line_seq[ch] + 1) & mask;
+                    n++;
+                    last_edge_ns[ch] = ts;
+                }
 
-            if (events > 0)
+                if (n > 0)
+                    tx_submit(&tx, frames, edges, chans, seqs, n);
+            }
+            else if (events > 0)
             {
                 struct timespec now;
                 clock_gettime(CLOCK_MONOTONIC_RAW, &now);
@@ -95,16 +700,35 @@ int main()
                     (now.tv_sec - last.tv_sec) * 1000000ULL +
                     (now.tv_nsec - last.tv_nsec) / 1000ULL;
 
-                if (diff > MIN_PERIOD_US)
+                if (diff > cfg.min_period_us)
                 {
-                    uint32_t word = 0x01010101u * value;
-                    write(uart, &word, 4);
-                    value++;
+                    encode_frame(frames, 0, line_seq[0], 0, 0);
+                    edges[0] = gpiod_edge_event_get_timestamp_ns(
+                        gpiod_edge_event_buffer_get_event(buffer, 0));
+                    chans[0] = 0;
+                    seqs[0] = line_seq[0];
+                    tx_submit(&tx, frames, edges, chans, seqs, 1);
+                    line_seq[0] = (line_seq[0] + 1) & mask;
                     last = now;
                 }
             }
         }
+
+        tx_poll(&tx);
     }
 
+    tx_flush(&tx);
+    if (tx.threshold)
+        fprintf(stderr,
+                "tx: %llu submits in %llu writes (%llu syscalls saved), "
+                "max queueing delay %.1f us\n",
+                (unsigned long long)tx.submits,
+                (unsigned long long)tx.writes,
+                (unsigned long long)(tx.submits - tx.writes),
+                tx.max_delay_ns / 1000.0);
+
+    if (timing)
+        fclose(timing);
+
     return 0;
 }
\ No newline at end of file
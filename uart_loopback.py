@@ -0,0 +1,173 @@
+"""
+uart_loopback.py
+----------------
+Virtual-UART harness for exercising uart_reader.py without hardware.
+
+A pseudo-terminal pair stands in for the UART: a Python emulator of the
+tm_fast word generator writes 0x01010101 * value words to the master side
+at a configurable rate, while one of uart_reader's reader modes reads the
+slave side (used in place of UART_PORT) through the normal Pipeline.
+
+Reported at the end of a run:
+
+  - Throughput  (frames/s and bytes/s actually decoded)
+  - Loss        (frames the SequenceTracker saw as missing, plus frames
+                 that never arrived before the drain timeout)
+  - Latency     (emulator write() -> reader read(), p50 / p99 / max)
+
+A pty applies back-pressure instead of dropping bytes, so an overloaded
+reader shows up as a sender falling behind schedule (see "achieved rate")
+and as growing latency rather than as loss.
+
+    python uart_loopback.py --rate 20000 --duration 5 --mode thread
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+import tty
+
+import numpy as np
+
+import uart_reader as ur
+
+# ── Configuration ────────────────────────────────────────────────────────────
+RATE_HZ    = 5000         # emulated edge rate, words per second
+DURATION_S = 5.0          # how long the emulator runs
+BURST      = 1            # words per write(), like tm_fast's batched modes
+DRAIN_S    = 1.0          # grace period for the reader after the last write
+# ─────────────────────────────────────────────────────────────────────────────
+
+
+def open_pty() -> tuple:
+    """Return (master_fd, slave_path) of a raw-mode pseudo-terminal pair."""
+    master, slave = os.openpty()
+    tty.setraw(master)
+    tty.setraw(slave)
+    path = os.ttyname(slave)
+    os.close(slave)          # the reader opens it again by path
+    return master, path
+
+
+def emulate_tm_fast(fd: int, rate: float, duration: float, burst: int,
+                    sent_ns: np.ndarray) -> int:
+    """
+    Write tm_fast words to `fd` on a fixed schedule of `rate` words/s.
+    The write time of word i is stored in sent_ns[i]; returns words sent.
+    """
+    total = min(len(sent_ns), int(rate * duration))
+    words = [bytes([value]) * 4 for value in range(256)]     # 0x01010101 * value
+    start = time.monotonic()
+    sent  = 0
+
+    while sent < total:
+        due = min(total, int((time.monotonic() - start) * rate) + 1)
+        if due - sent < burst and due < total:
+            time.sleep(burst / rate / 4)
+            continue
+        count = min(due, total) - sent
+        out   = b''.join(words[i & 0xFF] for i in range(sent, sent + count))
+        now   = time.monotonic_ns()
+        os.write(fd, out)
+        sent_ns[sent:sent + count] = now
+        sent += count
+
+    return sent
+
+
+class TimedPipeline(ur.Pipeline):
+    """Pipeline that records the arrival time of every decoded frame."""
+
+    def __init__(self, arrived_ns: np.ndarray):
+        super().__init__(display=False)
+        self.arrived_ns = arrived_ns
+
+    def process(self, frames, ts_ns: int | None = None, bodies=None) -> None:
+        now    = ts_ns or time.monotonic_ns()
+        before = self.packet_no
+        super().process(frames, ts_ns, bodies)
+        new = self.packet_no - before
+        if new:
+            # Frames of one chunk are consecutive; index them by the
+            # unwrapped sequence position of the last one.
+            last = self.seq.index
+            lo   = max(0, last - new + 1)
+            self.arrived_ns[lo:min(last + 1, len(self.arrived_ns))] = now
+
+
+def run_reader(mode: str, port: str, pipeline: ur.Pipeline) -> None:
+    ser = ur.open_uart(port)
+    if mode == 'async':
+        asyncio.run(ur.async_reader(ser, pipeline))
+    elif mode == 'thread':
+        ur.thread_reader(ser, pipeline)
+    elif mode == 'adaptive':
+        ur.adaptive_reader(ser, pipeline)
+    elif mode == 'farm':
+        ur.farm_reader(ser, pipeline)
+    else:
+        ur.poll_reader(ser, pipeline)
+
+
+def percentiles_us(latency_ns: np.ndarray) -> str:
+    if not latency_ns.size:
+        return 'n/a'
+    p50, p99, p999 = np.percentile(latency_ns, (50, 99, 99.9)) / 1e3
+    return (f"p50 {p50:.0f} us  p99 {p99:.0f} us  p99.9 {p999:.0f} us  "
+            f"max {latency_ns.max() / 1e3:.0f} us")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description='Benchmark uart_reader over a pty loopback.')
+    ap.add_argument('--rate', type=float, default=RATE_HZ, help='words per second')
+    ap.add_argument('--duration', type=float, default=DURATION_S, help='seconds to send')
+    ap.add_argument('--burst', type=int, default=BURST, help='words per write()')
+    ap.add_argument('--mode', choices=('poll', 'async', 'thread', 'adaptive', 'farm'), default='poll',
+                    help='uart_reader reader mode under test')
+    args = ap.parse_args()
+
+    master, slave_path = open_pty()
+
+    total      = int(args.rate * args.duration)
+    sent_ns    = np.zeros(total, dtype=np.int64)
+    arrived_ns = np.zeros(total, dtype=np.int64)
+    pipeline   = TimedPipeline(arrived_ns)
+
+    print(f"Loopback      : {slave_path}  ({args.mode} reader)")
+    print(f"Emulator      : {args.rate:g} words/s for {args.duration:g} s, "
+          f"{args.burst} word(s) per write")
+    ur.print_separator('═')
+
+    reader = threading.Thread(target=run_reader, args=(args.mode, slave_path, pipeline),
+                              name='reader-under-test', daemon=True)
+    reader.start()
+    time.sleep(0.2)                           # let the reader open the port
+
+    t0   = time.monotonic()
+    sent = emulate_tm_fast(master, args.rate, args.duration, max(1, args.burst), sent_ns)
+    t1   = time.monotonic()
+
+    deadline = t1 + DRAIN_S
+    while pipeline.packet_no < sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+    elapsed = time.monotonic() - t0
+
+    got     = arrived_ns[:sent] > 0
+    latency = arrived_ns[:sent][got] - sent_ns[:sent][got]
+
+    print(f"Sent          : {sent} frame(s), achieved rate {sent / (t1 - t0):,.0f} words/s")
+    print(f"Received      : {pipeline.packet_no} frame(s), "
+          f"{pipeline.byte_total / elapsed:,.0f} B/s, "
+          f"{pipeline.packet_no / elapsed:,.0f} frames/s")
+    print(f"Loss          : {pipeline.seq.dropped} in-stream, "
+          f"{sent - int(got.sum())} never delivered")
+    print(f"Latency       : {percentiles_us(latency)}")
+    print(f"Sequence      : {pipeline.seq.summary()}")
+    print(f"Chunk sizes   : {ur.size_histogram(pipeline.chunk_sizes)}")
+    print(f"Read calls    : {pipeline.read_calls}")
+
+
+if __name__ == '__main__':
+    main()
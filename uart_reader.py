@@ -12,185 +12,2230 @@ common interpretation of the incoming data:
   - ASCII / UTF-8 text (where printable)
 """
 
+import numpy as np
 import serial
 import struct
 import time
 import sys
+import os
+import asyncio
+import argparse
+import select
+import threading
+import queue
+import mmap
+import signal
+import codecs
+import re
+import json
+import bisect
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from numpy.lib.stride_tricks import sliding_window_view
 
 # ── Configuration ────────────────────────────────────────────────────────────
 UART_PORT  = '/dev/ttyAMA0'  # Raspberry Pi's primary UART
 BAUD_RATE  = 921600
 TIMEOUT_S  = 1.0          # read() timeout in seconds
 MAX_CHUNK  = 4096          # upper cap on bytes read per iteration
+FRAME_SIZE = 4             # tm_fast sends one 4-byte word per edge
+SEQ_MOD    = 256           # tm_fast counter is a uint8_t
+TAG_MARK   = 0xA0          # high nibble of byte 0 in tm_fast tagged frames
+ASYNC_QUEUE = 64           # pooled read buffers between async reader and consumer
+RING_SIZE  = 1 << 16       # reader-thread ring buffer, bytes
+STATS_S    = 1.0           # default stats interval for --quiet, seconds
+CAPTURE_BLOCK = 1 << 18    # capture bytes buffered before each writev()
+LATENCY_TARGET_S = 0.002   # adaptive reader: longest wait for a fuller read
+RATE_ALPHA = 0.2           # adaptive reader: EWMA weight of the newest rate sample
+FARM_WORKERS = max(1, (os.cpu_count() or 2) - 1)   # decode-farm worker processes
+FARM_BLOCK   = 1 << 16     # decode-farm shared-memory block, bytes
+FARM_FLUSH_S = 0.05        # longest a partly filled farm block waits for dispatch
+TEXT_MAX_LINE = 1 << 16    # text mode: characters held before a line is forced out
+STORE_CHUNK_ROWS = 1 << 16  # telemetry store: rows per column chunk
+STORE_MAX_CHUNKS = 64       # telemetry store: chunks kept in memory
 # ─────────────────────────────────────────────────────────────────────────────
 
 
+# Precomputed per-byte tables for the formatters below.  Short buffers join
+# cached strings; long ones gather rows of a (256, 9) byte table in NumPy.
+_BIN_TABLE   = tuple(f'{b:08b}' for b in range(256))
+_BIN_ROWS    = np.frombuffer(''.join(f'{b:08b} ' for b in range(256)).encode(),
+                             dtype=np.uint8).reshape(256, 9)
+_BIN_BULK    = 64            # bytes above which bin_dump() goes through NumPy
+_ASCII_TABLE = bytes(b if 32 <= b < 127 else ord('.') for b in range(256))
+
+
 def hex_dump(data: bytes) -> str:
     """Return a formatted hex dump: '0A 1B 2C 3D ...'"""
-    return ' '.join(f'{b:02X}' for b in data)
+    return memoryview(data).hex(' ').upper()
 
 
 def bin_dump(data: bytes) -> str:
     """Return binary representation of every byte: '00001010 00011011 ...'"""
-    return ' '.join(f'{b:08b}' for b in data)
+    if len(data) > _BIN_BULK:
+        rows = _BIN_ROWS[np.frombuffer(data, dtype=np.uint8)]
+        return rows.tobytes()[:-1].decode('ascii')
+    return ' '.join(map(_BIN_TABLE.__getitem__, data))
 
 
 def ascii_repr(data: bytes) -> str:
     """Return printable ASCII characters; replace non-printable with '.'"""
-    return ''.join(chr(b) if 32 <= b < 127 else '.' for b in data)
+    return bytes(data).translate(_ASCII_TABLE).decode('ascii')
 
 
-def decode_ints(data: bytes) -> dict:
+# ── Batch decoding engine ────────────────────────────────────────────────────
+# One table drives every integer / float interpretation.  Each entry maps a
+# display label to (width in bytes, NumPy dtype with explicit byte order), in
+# the order display_all() prints them.
+
+def _build_decode_table() -> dict:
+    table = {}
+    for size in (1, 2, 4, 8):
+        lbl = size * 8
+        for kind, name in (('u', 'uint'), ('i', 'int')):
+            for order, suffix in (('<', 'LE'), ('>', 'BE')):
+                table[f'{name}{lbl}_{suffix}'] = (size, np.dtype(f'{order}{kind}{size}'))
+    for size in (4, 8):
+        lbl = size * 8
+        for order, suffix in (('<', 'LE'), ('>', 'BE')):
+            table[f'float{lbl}_{suffix}'] = (size, np.dtype(f'{order}f{size}'))
+    return table
+
+
+DECODE_TABLE = _build_decode_table()
+INT_LABELS   = tuple(k for k in DECODE_TABLE if 'int' in k)
+FLOAT_LABELS = tuple(k for k in DECODE_TABLE if k.startswith('float'))
+
+# Single-packet path: one precompiled struct.Struct per label.  For a lone
+# 4-byte frame this is several times cheaper than building NumPy views.
+_STRUCT_CODES = {('u', 1): 'B', ('u', 2): 'H', ('u', 4): 'I', ('u', 8): 'Q',
+                 ('i', 1): 'b', ('i', 2): 'h', ('i', 4): 'i', ('i', 8): 'q',
+                 ('f', 4): 'f', ('f', 8): 'd'}
+_UNPACKERS    = {label: (size, struct.Struct(('<' if label.endswith('LE') else '>')
+                                             + _STRUCT_CODES[dtype.kind, size]).unpack_from)
+                 for label, (size, dtype) in DECODE_TABLE.items()}
+_INT_UNPACKERS   = tuple((label, *_UNPACKERS[label]) for label in INT_LABELS)
+_F32_LE, _F32_BE, _F64_LE, _F64_BE = (_UNPACKERS[label][1] for label in FLOAT_LABELS)
+
+
+def decode_batch(data, labels=None) -> dict:
     """
-    Try to decode the byte buffer as every standard integer width,
-    both signed and unsigned, both endiannesses.
-    Only returns widths that fit exactly into the buffer length.
+    Decode a whole buffer at every aligned offset in one pass.
+
+    Returns {label: ndarray} where entry i is the word at byte offset
+    i * width.  The arrays are read-only np.frombuffer views over `data`,
+    so nothing is copied.  Widths longer than the buffer are omitted.
     """
     n   = len(data)
     out = {}
 
-    widths = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}   # unsigned struct codes
-    signed = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}   # signed struct codes
-
-    for size, code in widths.items():
-        if n >= size:
-            # Use only the first <size> bytes for fixed-width reads,
-            # but also try to interpret the whole buffer when it matches.
-            chunk_le = data[:size]
-            chunk_be = data[:size]
-            u_le = struct.unpack_from('<' + code, chunk_le)[0]
-            u_be = struct.unpack_from('>' + code, chunk_be)[0]
-            s_le = struct.unpack_from('<' + signed[size], chunk_le)[0]
-            s_be = struct.unpack_from('>' + signed[size], chunk_be)[0]
-            lbl  = size * 8
-            out[f'uint{lbl}_LE'] = u_le
-            out[f'uint{lbl}_BE'] = u_be
-            out[f'int{lbl}_LE']  = s_le
-            out[f'int{lbl}_BE']  = s_be
+    for label in labels or DECODE_TABLE:
+        size, dtype = DECODE_TABLE[label]
+        count = n // size
+        if count:
+            out[label] = np.frombuffer(data, dtype=dtype, count=count)
 
     return out
 
 
+def decode_packets(packets, labels=None) -> dict:
+    """
+    Batch form of decode_ints() / decode_floats() for a list of packets.
+
+    Returns {label: masked array} holding the leading word of every packet.
+    Packets shorter than a width are masked out for that label.  The first
+    8 bytes of each packet are laid end to end and run through
+    decode_batch(); every (8 // width)-th word is then a packet's head.
+    """
+    count   = len(packets)
+    lengths = np.fromiter((len(p) for p in packets), dtype=np.intp, count=count)
+    heads   = b''.join(bytes(p[:8]).ljust(8, b'\0') for p in packets)
+    words   = decode_batch(heads, labels)
+    out     = {}
+
+    for label in labels or DECODE_TABLE:
+        size, dtype = DECODE_TABLE[label]
+        values = words[label][::8 // size] if count else np.empty(0, dtype=dtype)
+        out[label] = np.ma.masked_array(values, mask=lengths < size)
+
+    return out
+
+
+def decode_ints(data: bytes) -> dict:
+    """
+    Try to decode the byte buffer as every standard integer width,
+    both signed and unsigned, both endiannesses.
+    Only returns widths that fit into the buffer length, reading the
+    first <width> bytes.  Batches go through decode_packets() instead.
+    """
+    n = len(data)
+    return {label: unpack(data)[0] for label, size, unpack in _INT_UNPACKERS if n >= size}
+
+
 def decode_floats(data: bytes) -> dict:
     """Try to decode as 32-bit and 64-bit IEEE-754 floats."""
-    out = {}
     n   = len(data)
-
+    out = {}
     if n >= 4:
-        out['float32_LE'] = struct.unpack_from('<f', data[:4])[0]
-        out['float32_BE'] = struct.unpack_from('>f', data[:4])[0]
+        out['float32_LE'] = _F32_LE(data)[0]
+        out['float32_BE'] = _F32_BE(data)[0]
     if n >= 8:
-        out['float64_LE'] = struct.unpack_from('<d', data[:8])[0]
-        out['float64_BE'] = struct.unpack_from('>d', data[:8])[0]
-
+        out['float64_LE'] = _F64_LE(data)[0]
+        out['float64_BE'] = _F64_BE(data)[0]
     return out
 
 
+def decode_columns(packets) -> dict:
+    """
+    decode_packets() as {label: list} of Python numbers, None where a
+    packet is too short for the width.  Row k holds what decode_ints()
+    and decode_floats() would return for packets[k].
+    """
+    return {label: col.tolist() for label, col in decode_packets(packets).items()}
+
+
 def decode_utf8(data: bytes) -> str | None:
     """Attempt UTF-8 decode; return None on failure."""
     try:
-        return data.decode('utf-8')
+        return str(data, 'utf-8')
     except UnicodeDecodeError:
         return None
 
 
+# ── Schema-driven decoding ───────────────────────────────────────────────────
+# A declarative packet layout, compiled once.  display_all() remains the
+# discovery tool for unknown data; with a schema each frame costs one
+# struct unpack, and whole batches decode through one structured dtype.
+
+SCHEMA_TYPES = {          # schema type -> (struct code, NumPy kind + width)
+    'u8':  ('B', 'u1'), 'i8':  ('b', 'i1'),
+    'u16': ('H', 'u2'), 'i16': ('h', 'i2'),
+    'u32': ('I', 'u4'), 'i32': ('i', 'i4'),
+    'u64': ('Q', 'u8'), 'i64': ('q', 'i8'),
+    'f32': ('f', 'f4'), 'f64': ('d', 'f8'),
+}
+SCHEMA_ORDERS = {'little': '<', 'big': '>'}
+
+
+class PacketSchema:
+    """
+    Compiled packet layout.  Each field is a dict with name, offset, type
+    (a SCHEMA_TYPES key), optional endian ('little' default or 'big') and
+    optional scale / bias (value = raw * scale + bias).  Fields may not
+    overlap; size defaults to the end of the last field.
+
+    unpack() decodes one frame with a single precompiled struct.Struct (or,
+    when fields mix byte orders, which one Struct cannot express, through
+    the structured dtype); decode() views a buffer of back-to-back frames
+    through one NumPy structured dtype and returns a column per field.
+    """
+
+    def __init__(self, fields: list, size: int | None = None, name: str = 'schema'):
+        if not fields:
+            raise ValueError(f'{name}: no fields')
+        fields = sorted(fields, key=lambda f: f['offset'])
+        codes, dt, orders, pos = [], [], set(), 0
+        self.names, self.scales = [], []
+
+        for field in fields:
+            fname, offset, ftype = field['name'], field['offset'], field['type']
+            if ftype not in SCHEMA_TYPES:
+                raise ValueError(f"{name}: field {fname!r}: unknown type {ftype!r}")
+            order = SCHEMA_ORDERS.get(field.get('endian', 'little'))
+            if order is None:
+                raise ValueError(f"{name}: field {fname!r}: endian must be 'little' or 'big'")
+            if offset < pos:
+                raise ValueError(f"{name}: field {fname!r} overlaps the previous field")
+            code, kind = SCHEMA_TYPES[ftype]
+            if offset > pos:
+                codes.append(f'{offset - pos}x')
+            codes.append(code)
+            dt.append((fname, order + kind, offset))
+            if np.dtype(kind).itemsize > 1:
+                orders.add(order)
+            self.names.append(fname)
+            scale, bias = field.get('scale', 1), field.get('bias', 0)
+            self.scales.append(None if (scale, bias) == (1, 0) else (scale, bias))
+            pos = offset + np.dtype(kind).itemsize
+
+        self.name  = name
+        self.size  = pos if size is None else size
+        if self.size < pos:
+            raise ValueError(f'{name}: size {self.size} is shorter than its fields ({pos})')
+        self.dtype = np.dtype({'names':    [d[0] for d in dt],
+                               'formats':  [d[1] for d in dt],
+                               'offsets':  [d[2] for d in dt],
+                               'itemsize': self.size})
+        # Explicit byte-order prefixes never insert alignment padding.
+        self.struct = (struct.Struct((orders.pop() if orders else '<') + ''.join(codes))
+                       if len(orders) <= 1 else None)
+
+    @classmethod
+    def from_dict(cls, doc: dict, name: str = 'schema') -> 'PacketSchema':
+        return cls(doc['fields'], doc.get('size'), doc.get('name', name))
+
+    @classmethod
+    def load(cls, path: str) -> 'PacketSchema':
+        """Read a JSON schema: {"name": ..., "size": ..., "fields": [...]}."""
+        with open(path) as f:
+            doc = json.load(f)
+        try:
+            return cls.from_dict(doc, path)
+        except (KeyError, TypeError) as exc:
+            raise ValueError(f'{path}: malformed schema ({exc!r})') from None
+
+    def unpack(self, frame) -> dict:
+        """Decode one frame into {field: value}, scaled."""
+        if self.struct is not None:
+            raw = self.struct.unpack_from(frame)
+        else:
+            raw = np.frombuffer(frame, dtype=self.dtype, count=1)[0].tolist()
+        return {name: value if sc is None else value * sc[0] + sc[1]
+                for name, value, sc in zip(self.names, raw, self.scales)}
+
+    def decode(self, data) -> dict:
+        """
+        Decode every whole frame in a buffer of back-to-back frames.
+        Returns {field: ndarray}; unscaled columns are zero-copy views.
+        """
+        mv   = memoryview(data).cast('B')
+        rows = np.frombuffer(mv, dtype=self.dtype, count=len(mv) // self.size)
+        return {name: rows[name] if sc is None else rows[name] * sc[0] + sc[1]
+                for name, sc in zip(self.names, self.scales)}
+
+
+def format_fields(values: dict) -> str:
+    return '  '.join(f"{k}={v:.6g}" if isinstance(v, float) else f"{k}={v}"
+                     for k, v in values.items())
+
+
+class LineAssembler:
+    """
+    Streaming text decoder for text telemetry.  An incremental UTF-8
+    decoder carries a character split across reads into the next chunk,
+    and feed() returns only whole lines, split on any of `terminators`
+    (terminators removed).  Each chunk is decoded and searched once.  If
+    the text ends with a proper prefix of a longer terminator (a lone '\r'
+    when '\r\n' is also a terminator, say) those few characters are held
+    back until the next chunk shows how the terminator ends, so the lines
+    never depend on where reads happen to split.  A partial line longer
+    than max_line is emitted as-is to bound memory.  Undecodable bytes
+    become U+FFFD and are counted.
+    """
+
+    def __init__(self, terminators=('\n',), max_line: int = TEXT_MAX_LINE,
+                 encoding: str = 'utf-8'):
+        terms = sorted(set(terminators), key=len, reverse=True)
+        if not terms or not all(terms):
+            raise ValueError('need at least one non-empty line terminator')
+        self.terminators = tuple(terms)
+        self.max_line    = max_line
+        self.lines       = 0
+        self.errors      = 0          # replacement characters produced
+        self._decoder    = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self._keep       = len(terms[0]) - 1
+        self._prefixes   = {term[:n] for term in terms for n in range(1, len(term))}
+        self._held       = ''         # possible start of a terminator
+        self._parts      = []         # pending partial line
+        self._pending    = 0          # characters in _parts
+        if len(terms) == 1:
+            self._split = lambda text, term=terms[0]: text.split(term)
+        else:
+            self._split = re.compile('|'.join(map(re.escape, terms))).split
+
+    def _holdback(self, tail: str) -> int:
+        """Length of the longest suffix of tail that a terminator could continue."""
+        for n in range(min(self._keep, len(tail)), 0, -1):
+            if tail[-n:] in self._prefixes:
+                return n
+        return 0
+
+    def feed(self, chunk) -> list:
+        text = self._decoder.decode(chunk)
+        if not text:
+            return []
+        self.errors += text.count('\ufffd')
+
+        if self._held:
+            text = self._held + text
+        pieces = self._split(text)
+        tail   = pieces.pop()
+        held   = ''
+        if self._keep:
+            # The last terminator plus the tail may be the start of a longer
+            # terminator ('\r' of '\r\n'): un-split it until the next chunk.
+            last = ''
+            if pieces:
+                end  = len(text) - len(tail)
+                last = next(term for term in self.terminators if text.endswith(term, 0, end))
+            if last and last + tail in self._prefixes:
+                held, tail = last + tail, pieces.pop()
+            else:
+                n = self._holdback(tail)
+                if n:
+                    held, tail = tail[-n:], tail[:-n]
+        self._held = held
+
+        if not pieces:
+            self._parts.append(tail)
+            self._pending += len(tail)
+            if self._pending <= self.max_line:
+                return []
+            lines = [''.join(self._parts)]
+            self._parts, self._pending = [], 0
+        else:
+            lines = [''.join(self._parts) + pieces[0]]
+            lines.extend(pieces[1:])
+            self._parts, self._pending = ([tail], len(tail)) if tail else ([], 0)
+
+        self.lines += len(lines)
+        return lines
+
+    def flush(self) -> list:
+        """
+        End of stream: return (and forget) the lines still pending, the last
+        one possibly unterminated.
+        """
+        pieces = self._split(self._held + self._decoder.decode(b'', final=True))
+        lines  = [''.join(self._parts) + pieces[0]] + pieces[1:]
+        if not lines[-1]:
+            lines.pop()
+        self._parts, self._pending, self._held = [], 0, ''
+        self.lines += len(lines)
+        return lines
+
+    def summary(self) -> str:
+        return (f"{self.lines} line(s), {self.errors} undecodable byte sequence(s), "
+                f"{self._pending + len(self._held)} character(s) pending")
+
+
+# ── Frame synchronisation ────────────────────────────────────────────────────
+
+def tm_word_mask(rows: np.ndarray) -> np.ndarray:
+    """
+    Validity check for tm_fast words (0x01010101 * value): all four bytes
+    equal.  Takes an (n, FRAME_SIZE) uint8 array, returns an n-long bool mask.
+    """
+    return (rows == rows[:, :1]).all(axis=1)
+
+
+def tagged_word_mask(rows: np.ndarray) -> np.ndarray:
+    """
+    Validity check for tm_fast tagged frames (0xA0 | line, seq, ~tag, ~seq),
+    sent when several GPIO lines are fanned into one UART.
+    """
+    return (((rows[:, 0] & 0xF0) == TAG_MARK)
+            & ((rows[:, 0] ^ rows[:, 2]) == 0xFF)
+            & ((rows[:, 1] ^ rows[:, 3]) == 0xFF))
+
+
+# tm_fast compact frames: sync marker A5 5A, line channel, edge kind, 16- or
+# 32-bit per-line sequence, microseconds since the line's previous edge and
+# a CRC-16/CCITT-FALSE of the bytes before it.  All fields little-endian.
+COMPACT_DTYPES = {
+    f'compact{bits}': np.dtype([('sync', '<u2'), ('line', 'u1'), ('kind', 'u1'),
+                                ('seq', f'<u{bits // 8}'), ('dt_us', '<u4'),
+                                ('crc', '<u2')])
+    for bits in (16, 32)
+}
+COMPACT_STRUCTS = {name: struct.Struct('<HBB' + ('H' if dt['seq'].itemsize == 2 else 'I') + 'IH')
+                   for name, dt in COMPACT_DTYPES.items()}
+
+
+def _build_crc16_table(poly: int = 0x1021) -> np.ndarray:
+    table = np.empty(256, dtype=np.uint16)
+    for b in range(256):
+        crc = b << 8
+        for _ in range(8):
+            crc = (crc << 1) ^ poly if crc & 0x8000 else crc << 1
+        table[b] = crc & 0xFFFF
+    return table
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+def crc16_rows(rows: np.ndarray, crc: int = 0xFFFF) -> np.ndarray:
+    """
+    CRC-16/CCITT-FALSE of every row of an (n, L) uint8 array.  The table
+    is applied column by column to the whole batch, so the cost is L NumPy
+    gathers regardless of n, with no per-frame Python.
+    """
+    out = np.full(len(rows), crc, dtype=np.uint16)
+    for j in range(rows.shape[1]):
+        out = (out << 8) ^ _CRC16_TABLE[(out >> 8) ^ rows[:, j]]
+    return out
+
+
+def _compact_checks(rows: np.ndarray) -> tuple:
+    """(sync marker ok, CRC ok) masks for an (n, frame size) uint8 array."""
+    sync   = (rows[:, 0] == 0xA5) & (rows[:, 1] == 0x5A)
+    stored = rows[:, -2] | rows[:, -1].astype(np.uint16) << 8
+    return sync, crc16_rows(rows[:, :-2]) == stored
+
+
+def compact_mask(rows: np.ndarray) -> np.ndarray:
+    """Validity check for compact frames: sync marker and CRC both match."""
+    sync, crc_ok = _compact_checks(rows)
+    return sync & crc_ok
+
+
+def verify_frames(data, frame_format: str = 'compact16') -> tuple:
+    """
+    Batch integrity check of back-to-back compact frames (a trailing partial
+    frame is ignored).  Returns (good, bad_sync, bad_crc): a bool mask of
+    good frames, the number without the sync marker and the number whose
+    marker is present but CRC does not match.
+    """
+    size = COMPACT_DTYPES[frame_format].itemsize
+    buf  = np.frombuffer(memoryview(data).cast('B'), dtype=np.uint8)
+    rows = buf[:len(buf) // size * size].reshape(-1, size)
+    sync, crc_ok = _compact_checks(rows)
+    good = sync & crc_ok
+    return good, int(len(rows) - np.count_nonzero(sync)), int(np.count_nonzero(sync & ~crc_ok))
+
+
+def parse_compact(data, frame_format: str = 'compact16') -> np.ndarray:
+    """
+    Zero-copy structured view (sync, line, kind, seq, dt_us, crc) of
+    back-to-back compact frames; a trailing partial frame is ignored.
+    """
+    dtype = COMPACT_DTYPES[frame_format]
+    mv    = memoryview(data).cast('B')
+    return np.frombuffer(mv, dtype=dtype, count=len(mv) // dtype.itemsize)
+
+
+# Frame format name -> (frame size, FrameSync validity check).
+FRAME_FORMATS = {
+    'word':   (FRAME_SIZE, tm_word_mask),
+    'tagged': (FRAME_SIZE, tagged_word_mask),
+    **{name: (dt.itemsize, compact_mask) for name, dt in COMPACT_DTYPES.items()},
+}
+
+
+class FrameSync:
+    """
+    Incremental frame synchroniser for the UART byte stream.
+
+    feed() accepts read fragments of any size and returns the complete,
+    aligned frames they contain as memoryview slices of the chunk itself.
+    Only a partial frame (< frame_size bytes) is carried between calls, so
+    re-locking never copies the whole buffer.  While locked, frames are
+    validated in bulk; on the first invalid frame the sync drops lock and
+    hunts byte-by-byte (vectorised) for the next valid alignment.
+    """
+
+    def __init__(self, frame_size: int = FRAME_SIZE, check=tm_word_mask):
+        self.frame_size = frame_size
+        self.check      = check
+        self.locked     = False
+        self.frames     = 0      # frames emitted
+        self.slipped    = 0      # bytes discarded while hunting
+        self.resyncs    = 0      # times lock was lost
+        self._tail      = b''
+
+    def feed(self, chunk) -> list:
+        mv     = memoryview(chunk).cast('B')
+        frames = []
+        pos    = 0
+
+        if self._tail:
+            # Stitch the frame straddling the previous chunk: only the tail
+            # plus the first frame_size - 1 new bytes are joined.
+            tail   = self._tail
+            joined = tail + bytes(mv[:self.frame_size - 1])
+            buf    = np.frombuffer(joined, dtype=np.uint8)
+            starts, pos = self._scan(buf, 0, len(tail))
+            frames.extend(joined[s:s + self.frame_size] for s in starts)
+            if pos < len(tail):             # chunk too short to finish it
+                self._tail = joined[pos:]
+                self.frames += len(frames)
+                return frames
+            pos -= len(tail)
+
+        buf = np.frombuffer(mv, dtype=np.uint8)
+        starts, pos = self._scan(buf, pos, len(buf))
+        frames.extend(mv[s:s + self.frame_size] for s in starts)
+
+        self._tail   = bytes(mv[pos:])
+        self.frames += len(frames)
+        return frames
+
+    def _scan(self, buf: np.ndarray, pos: int, limit: int) -> tuple:
+        """
+        Find valid frames in buf that start before `limit`.
+        Returns (list of start offsets, offset where scanning stopped).
+        """
+        fs  = self.frame_size
+        end = len(buf)
+        out = []
+
+        while pos < limit and end - pos >= fs:
+            if not self.locked:
+                windows = sliding_window_view(buf[pos:min(end, limit + fs - 1)], fs)
+                hits    = np.flatnonzero(self.check(windows))
+                if not hits.size:
+                    self.slipped += len(windows)
+                    pos          += len(windows)
+                    break
+                self.slipped += int(hits[0])
+                pos          += int(hits[0])
+                self.locked   = True
+
+            count = min((end - pos) // fs, -(-(limit - pos) // fs))
+            rows  = buf[pos:pos + count * fs].reshape(count, fs)
+            bad   = np.flatnonzero(~self.check(rows))
+            run   = int(bad[0]) if bad.size else count
+            out.extend(range(pos, pos + run * fs, fs))
+            pos  += run * fs
+            if run < count:
+                self.locked   = False
+                self.resyncs += 1
+
+        return out, pos
+
+
+# ── Sequence checking ────────────────────────────────────────────────────────
+
+class SequenceTracker:
+    """
+    Drop / duplicate / wraparound accounting for a modular frame counter.
+
+    update() does a constant amount of work per frame, so the tracker can
+    stay enabled at full line rate.  A forward jump of d counts as d - 1
+    dropped frames; a repeat of the previous value counts as a duplicate.
+    """
+
+    def __init__(self, modulus: int = SEQ_MOD):
+        self.modulus     = modulus
+        self.last        = None
+        self.received    = 0
+        self.dropped     = 0
+        self.duplicates  = 0
+        self.wraps       = 0
+        self.longest_gap = 0
+        self.index       = -1        # unwrapped position of the last frame
+
+    def update(self, seq: int) -> int:
+        """Record one sequence number; return how many frames were missed before it."""
+        last = self.last
+        self.received += 1
+        if last is None:
+            self.last  = seq
+            self.index = 0
+            return 0
+
+        delta = (seq - last) % self.modulus
+        if delta == 0:
+            self.duplicates += 1
+            return 0
+        if seq < last:
+            self.wraps += 1
+
+        gap = delta - 1
+        self.index += delta
+        if gap:
+            self.dropped += gap
+            if gap > self.longest_gap:
+                self.longest_gap = gap
+        self.last = seq
+        return gap
+
+    @property
+    def loss_rate(self) -> float:
+        """Fraction of expected frames that never arrived."""
+        expected = self.received - self.duplicates + self.dropped
+        return self.dropped / expected if expected else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.received} frame(s), {self.dropped} dropped "
+                f"({self.loss_rate:.3%}), {self.duplicates} duplicate(s), "
+                f"{self.wraps} wrap(s), longest gap {self.longest_gap}")
+
+
+class LineTrackers(dict):
+    """
+    One SequenceTracker per tm_fast line channel, for tagged and compact
+    frames.  The totals read like a single tracker's so stats and reports
+    need no special case.
+    """
+
+    def __init__(self, modulus: int = SEQ_MOD):
+        super().__init__()
+        self.modulus = modulus
+
+    def tracker(self, line: int) -> SequenceTracker:
+        t = self.get(line)
+        if t is None:
+            t = self[line] = SequenceTracker(self.modulus)
+        return t
+
+    @property
+    def dropped(self) -> int:
+        return sum(t.dropped for t in self.values())
+
+    @property
+    def duplicates(self) -> int:
+        return sum(t.duplicates for t in self.values())
+
+    @property
+    def received(self) -> int:
+        return sum(t.received for t in self.values())
+
+    def summary(self) -> str:
+        if not self:
+            return 'no frames'
+        return '\n                '.join(f"line {line}: {self[line].summary()}"
+                                       for line in sorted(self))
+
+
+class IntervalStats:
+    """
+    Running mean, standard deviation and extremes of the edge intervals
+    (dt_us) carried by compact frames: the edge jitter seen at the receiver.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean  = 0.0
+        self.min   = None
+        self.max   = 0
+        self._m2   = 0.0
+
+    def add(self, us: int) -> None:
+        self.count += 1
+        delta       = us - self.mean
+        self.mean  += delta / self.count
+        self._m2   += delta * (us - self.mean)
+        if self.min is None or us < self.min:
+            self.min = us
+        if us > self.max:
+            self.max = us
+
+    @property
+    def std(self) -> float:
+        return (self._m2 / (self.count - 1)) ** 0.5 if self.count > 1 else 0.0
+
+    def summary(self) -> str:
+        if not self.count:
+            return 'no intervals'
+        return (f"mean {self.mean:.1f} us, sd {self.std:.1f} us, "
+                f"min {self.min} us, max {self.max} us ({self.count} interval(s))")
+
+
 def print_separator(char: str = '─', width: int = 70) -> None:
     print(char * width)
 
 
-def display_all(data: bytes, packet_no: int) -> None:
-    """Pretty-print every interpretation of the received bytes."""
-    ts = time.strftime('%H:%M:%S')
-    print_separator()
-    print(f"  Packet #{packet_no:>6}  |  {ts}  |  {len(data)} byte(s)")
-    print_separator('─')
+def format_header(packet_no: int, size: int) -> str:
+    """Packet banner printed above format_body()."""
+    ts   = time.strftime('%H:%M:%S')
+    rule = '─' * 70
+    return f"{rule}\n  Packet #{packet_no:>6}  |  {ts}  |  {size} byte(s)\n{rule}"
+
 
+def format_body(data: bytes, words: dict | None = None) -> str:
+    """
+    Every interpretation of the received bytes, as display_all() prints it.
+    words, if given, is this packet's row of decode_columns() for a batch.
+    """
     # ── Raw representations ──────────────────────────────────────────────────
-    print(f"  HEX    : {hex_dump(data)}")
-    print(f"  BINARY : {bin_dump(data)}")
-    print(f"  ASCII  : {ascii_repr(data)}")
+    lines = [
+        f"  HEX    : {hex_dump(data)}",
+        f"  BINARY : {bin_dump(data)}",
+        f"  ASCII  : {ascii_repr(data)}",
+    ]
 
     # ── UTF-8 text ───────────────────────────────────────────────────────────
     utf8 = decode_utf8(data)
     if utf8 is not None:
         printable = utf8.strip()
         if printable:
-            print(f"  UTF-8  : {printable!r}")
+            lines.append(f"  UTF-8  : {printable!r}")
 
     # ── Integer interpretations ──────────────────────────────────────────────
-    ints = decode_ints(data)
+    if words is None:
+        ints, floats = decode_ints(data), decode_floats(data)
+    else:
+        ints   = {label: words[label] for label in INT_LABELS if words[label] is not None}
+        floats = {label: words[label] for label in FLOAT_LABELS if words[label] is not None}
     if ints:
-        print()
-        print("  ── Integer interpretations ─────────────────────")
-        for label, value in ints.items():
-            print(f"    {label:<12}: {value}")
+        lines.append('')
+        lines.append("  ── Integer interpretations ─────────────────────")
+        lines.extend(f"    {label:<12}: {value}" for label, value in ints.items())
 
     # ── Float interpretations ────────────────────────────────────────────────
-    floats = decode_floats(data)
     if floats:
-        print()
-        print("  ── Float interpretations ───────────────────────")
-        for label, value in floats.items():
-            print(f"    {label:<12}: {value:.6g}")
+        lines.append('')
+        lines.append("  ── Float interpretations ───────────────────────")
+        lines.extend(f"    {label:<12}: {value:.6g}" for label, value in floats.items())
 
-    print()
+    lines.append('')
+    return '\n'.join(lines)
 
 
-def main() -> None:
-    print(f"Opening UART  : {UART_PORT}")
-    print(f"Baud rate     : {BAUD_RATE}")
-    print(f"Read mode     : dynamic (in_waiting), max {MAX_CHUNK} bytes")
-    print(f"Timeout       : {TIMEOUT_S} s")
-    print_separator('═')
-    print("Listening for data... (Ctrl+C to stop)")
-    print_separator('═')
+def display_all(data: bytes, packet_no: int) -> None:
+    """Pretty-print every interpretation of the received bytes."""
+    print(format_header(packet_no, len(data)))
+    print(format_body(data))
+
+
+# ── Display sampling ─────────────────────────────────────────────────────────
+
+class DisplaySampler:
+    """
+    Gate for display_all() when frames arrive faster than a terminal can
+    print them.  The pipeline still counts and checks every frame; the
+    sampler only decides which ones get rendered, in O(1) and without
+    blocking.
+
+      every          : render every Nth frame
+      max_rate       : render at most K frames per 1 s window (the first K)
+      anomalies_only : render only frames that follow a gap / duplicate
+
+    Anomalous frames bypass the every-N filter but still respect max_rate.
+    """
+
+    def __init__(self, every: int = 1, max_rate: int | None = None,
+                 anomalies_only: bool = False):
+        self.every          = max(1, every)
+        self.max_rate       = max_rate
+        self.anomalies_only = anomalies_only
+        self.rendered       = 0
+        self.skipped        = 0
+        self._window_end    = 0.0
+        self._window_count  = 0
+
+    def __call__(self, packet_no: int, anomalous: bool) -> bool:
+        if not anomalous and (self.anomalies_only or packet_no % self.every):
+            self.skipped += 1
+            return False
+
+        if self.max_rate:
+            now = time.monotonic()
+            if now >= self._window_end:
+                self._window_end   = now + 1.0
+                self._window_count = 0
+            if self._window_count >= self.max_rate:
+                self.skipped += 1
+                return False
+            self._window_count += 1
+
+        self.rendered += 1
+        return True
+
+
+# ── Ring buffer ──────────────────────────────────────────────────────────────
+
+class RingBuffer:
+    """
+    Single-producer / single-consumer byte ring over a fixed bytearray.
+
+    `head` and `tail` are running byte counts: only the writer advances
+    head and only the reader advances tail, so the two threads never take
+    a lock.  A full ring never stalls the writer; the bytes it could not
+    store are counted in `overflows` / `overflow_bytes` instead.
+    """
+
+    def __init__(self, size: int = RING_SIZE):
+        self.size           = size
+        self.view           = memoryview(bytearray(size))
+        self.head           = 0
+        self.tail           = 0
+        self.high_water     = 0      # peak fill level, bytes
+        self.commit_ns      = 0      # arrival time of the newest bytes
+        self.overflows      = 0      # reads that found the ring full
+        self.overflow_bytes = 0      # bytes dropped by those reads
+
+    def __len__(self) -> int:
+        return self.head - self.tail
+
+    def _spans(self, start: int, count: int) -> list:
+        """Up to two views covering `count` bytes from running offset `start`."""
+        if not count:
+            return []
+        start %= self.size
+        first  = min(count, self.size - start)
+        spans  = [self.view[start:start + first]]
+        if count > first:
+            spans.append(self.view[:count - first])
+        return spans
+
+    def write_spans(self) -> list:
+        return self._spans(self.head, self.size - len(self))
+
+    def commit(self, n: int, ts_ns: int = 0) -> None:
+        self.commit_ns = ts_ns
+        self.head     += n
+        fill = self.head - self.tail
+        if fill > self.high_water:
+            self.high_water = fill
+
+    def read_spans(self) -> list:
+        return self._spans(self.tail, len(self))
+
+    def release(self, n: int) -> None:
+        self.tail += n
+
+
+# ── Capture recording ────────────────────────────────────────────────────────
+# File layout: CAPTURE_MAGIC, then one record per UART chunk consisting of a
+# CAPTURE_RECORD header (CLOCK_MONOTONIC ns, payload length) and the payload.
+
+CAPTURE_MAGIC  = b'TMCAP001'
+CAPTURE_RECORD = struct.Struct('<QI')
+IOV_MAX        = os.sysconf('SC_IOV_MAX') if hasattr(os, 'sysconf') else 1024
+
+
+def _writev_all(fd: int, bufs: list) -> int:
+    """os.writev() that copes with partial writes and IOV_MAX; returns call count."""
+    calls = 0
+    while bufs:
+        batch   = bufs[:IOV_MAX]
+        written = os.writev(fd, batch)
+        calls  += 1
+        # Drop fully written buffers, trim a partially written one.
+        done = 0
+        for buf in batch:
+            if written < len(buf):
+                break
+            written -= len(buf)
+            done    += 1
+        bufs = bufs[done:]
+        if written:
+            bufs[0] = memoryview(bufs[0])[written:]
+    return calls
+
+
+class CaptureError(RuntimeError):
+    """The capture writer thread failed; the cause is chained."""
+
+
+class CaptureWriter:
+    """
+    Append-only binary recorder for raw UART chunks.
+
+    append() only stamps the chunk and queues two iovecs (header, payload).
+    Once `block` bytes are pending the batch goes to a writer thread, which
+    issues os.writev() and applies the fsync policy, so a slow SD card never
+    stalls the reader.  fsync policy: 'never', 'block' (after every written
+    block) or a number of seconds between fsyncs.
+
+    If a write or fsync fails (a full SD card, say) the writer thread stops
+    and keeps the OSError; the next append(), flush() or close() raises it
+    as CaptureError instead of queueing more batches nobody will write.
+
+    A capture holds one run: a non-empty file, capture or not, is refused
+    with ValueError rather than appended to, so timestamps stay monotonic.
+    """
+
+    def __init__(self, path: str, fsync='never', block: int = CAPTURE_BLOCK):
+        self.path   = path
+        self.block  = block
+        self.fsync  = fsync
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            if os.fstat(fd).st_size:
+                with open(path, 'rb') as f:
+                    magic = f.read(len(CAPTURE_MAGIC))
+                if magic != CAPTURE_MAGIC:
+                    raise ValueError('not empty and not a uart_reader capture file')
+                raise ValueError('already holds a capture; record each run to a new file')
+            os.write(fd, CAPTURE_MAGIC)
+        except BaseException:
+            os.close(fd)
+            raise
+        self.fd = fd
+
+        self.records        = 0
+        self.bytes_recorded = 0      # bytes actually written
+        self.writes         = 0      # writev() calls
+        self.fsyncs         = 0
+        self.error          = None   # OSError that stopped the writer thread
+        self._raised        = False
+        self._pending       = []
+        self._pending_bytes = 0
+        self._batches       = queue.SimpleQueue()
+        self._thread        = threading.Thread(target=self._writer, name='capture-writer',
+                                               daemon=True)
+        self._thread.start()
+
+    def append(self, chunk, ts_ns: int | None = None) -> None:
+        if self.error is not None:
+            self._raise()
+        if ts_ns is None:
+            ts_ns = time.monotonic_ns()
+        # Reused read buffers must be copied; bytes objects are kept as-is.
+        payload = chunk if type(chunk) is bytes else bytes(chunk)
+        self._pending.append(CAPTURE_RECORD.pack(ts_ns, len(payload)))
+        self._pending.append(payload)
+        self._pending_bytes += CAPTURE_RECORD.size + len(payload)
+        self.records        += 1
+        if self._pending_bytes >= self.block:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.error is not None:
+            self._raise()
+        if self._pending:
+            self._batches.put((self._pending, self._pending_bytes))
+            self._pending        = []
+            self._pending_bytes  = 0
+
+    def close(self) -> None:
+        """Write what is pending, fsync and close; raises CaptureError once on failure."""
+        if self.fd is None:
+            return
+        if self.error is None:
+            self.flush()
+        self._batches.put(None)
+        self._thread.join()
+        try:
+            if self.error is None:
+                os.fsync(self.fd)
+        except OSError as exc:
+            self.error = exc
+        finally:
+            os.close(self.fd)
+            self.fd = None
+        if self.error is not None and not self._raised:
+            self._raise()
+
+    def _raise(self) -> None:
+        self._raised = True
+        raise CaptureError(f'recording to {self.path} failed: {self.error}') from self.error
+
+    def _writer(self) -> None:
+        interval   = None if self.fsync in ('never', 'block') else float(self.fsync)
+        last_fsync = time.monotonic()
+        try:
+            while (item := self._batches.get()) is not None:
+                batch, nbytes = item
+                self.writes += _writev_all(self.fd, batch)
+                self.bytes_recorded += nbytes
+                if self.fsync == 'block' or (
+                        interval is not None and time.monotonic() - last_fsync >= interval):
+                    os.fsync(self.fd)
+                    self.fsyncs += 1
+                    last_fsync   = time.monotonic()
+        except OSError as exc:
+            self.error = exc
+
+    def summary(self) -> str:
+        status = f", FAILED: {self.error}" if self.error is not None else ''
+        return (f"{self.records} chunk(s), {self.bytes_recorded} byte(s) in "
+                f"{self.writes} writev(s), {self.fsyncs} fsync(s) -> {self.path}{status}")
+
+
+def iter_capture(buf):
+    """
+    Yield (timestamp_ns, payload) for every record in a capture buffer.
+    Payloads are memoryview slices of `buf`, so nothing is copied.  A
+    truncated trailing record (recorder killed mid-write) is ignored.
+    """
+    if bytes(buf[:len(CAPTURE_MAGIC)]) != CAPTURE_MAGIC:
+        raise ValueError('not a uart_reader capture file')
+    view = memoryview(buf)
+
+    unpack = CAPTURE_RECORD.unpack_from
+    hdr    = CAPTURE_RECORD.size
+    end    = len(view)
+    pos    = len(CAPTURE_MAGIC)
+    while pos + hdr <= end:
+        ts_ns, n = unpack(view, pos)
+        pos += hdr
+        if pos + n > end:
+            break
+        yield ts_ns, view[pos:pos + n]
+        pos += n
+
+
+def replay_capture(path: str, pipeline, realtime: bool = False, speed: float = 1.0) -> None:
+    """
+    Feed a capture file through the pipeline from a read-only mmap.
+    Runs as fast as the CPU allows, or at the recorded pace (scaled by
+    `speed`) when realtime is set.
+    """
+    with open(path, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The map is unmapped when the last view goes away rather than closed
+    # here: an exception raised mid-feed still references payload slices.
+    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    origin = None
+    for ts_ns, payload in iter_capture(mm):
+        if realtime:
+            if origin is None:
+                origin = (time.monotonic(), ts_ns)
+            delay = origin[0] + (ts_ns - origin[1]) / 1e9 / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        pipeline.feed(payload, ts_ns)
+
+
+# ── Latency instrumentation ──────────────────────────────────────────────────
+
+class TimingLog:
+    """
+    Per-frame reader timestamps for latency_report.py.
+
+    One CSV row per frame: unwrapped sequence index of the frame's line,
+    the line (channel; 0 for word frames), the sequence value, arrival_ns
+    (when the chunk holding the frame was read) and decode_ns (when the
+    frame left frame sync + sequence checking).  Both are CLOCK_MONOTONIC,
+    the clock tm_fast stamps its edges and writes with.
+    """
+
+    def __init__(self, path: str):
+        self.path   = path
+        self.frames = 0
+        self._file  = open(path, 'w', buffering=1 << 20)
+        self._file.write('index,line,seq,arrival_ns,decode_ns\n')
+
+    def log(self, index: int, line: int, seq: int, arrival_ns: int) -> None:
+        self._file.write(f'{index},{line},{seq},{arrival_ns},{time.monotonic_ns()}\n')
+        self.frames += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+# ── Read buffer pool ─────────────────────────────────────────────────────────
+
+class BufferPool:
+    """
+    Fixed set of preallocated read buffers.  Readers fill one in place
+    (os.readv), hand the pipeline a memoryview of the filled part and
+    release() the buffer once it has been consumed, so steady-state reads
+    allocate nothing.  acquire() waits while every buffer is in use, which
+    back-pressures the reader; with block=False it returns None instead.
+    """
+
+    def __init__(self, count: int = 1, size: int = MAX_CHUNK):
+        self.count      = count
+        self.size       = size
+        self.in_use     = 0
+        self.high_water = 0
+        self.exhausted  = 0      # acquires that found no free buffer
+        self._free      = queue.SimpleQueue()
+        for _ in range(count):
+            self._free.put(bytearray(size))
+
+    def acquire(self, block: bool = True, timeout: float | None = None) -> bytearray | None:
+        try:
+            buf = self._free.get_nowait()
+        except queue.Empty:
+            self.exhausted += 1
+            if not block:
+                return None
+            try:
+                buf = self._free.get(timeout=timeout)
+            except queue.Empty:
+                return None
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return buf
+
+    def release(self, buf: bytearray) -> None:
+        self.in_use -= 1
+        self._free.put(buf)
+
+    def summary(self) -> str:
+        return (f"{self.count} x {self.size} B, high-water {self.high_water} in use, "
+                f"{self.exhausted} time(s) exhausted")
+
+
+# ── Adaptive read sizing ─────────────────────────────────────────────────────
+
+class ReadSizer:
+    """
+    Picks the next read size for adaptive_reader() from an EWMA of the
+    arrival rate: the bytes expected within the latency target, never less
+    than what the kernel already holds, clamped to [frame_size, max_size]
+    and rounded down to whole frames.  Slow streams get small, prompt reads;
+    bursts get large ones.  A shorter target favours latency, a longer one
+    fewer, larger reads.
+    """
+
+    def __init__(self, target_s: float = LATENCY_TARGET_S, frame_size: int = FRAME_SIZE,
+                 max_size: int = MAX_CHUNK, alpha: float = RATE_ALPHA):
+        self.target_s   = target_s
+        self.frame_size = frame_size
+        self.max_size   = max_size - max_size % frame_size
+        self.alpha      = alpha
+        self.rate       = 0.0        # bytes/s
+        self._last_ns   = None
+
+    def observe(self, n: int, now_ns: int) -> None:
+        """Account n bytes read at now_ns since the previous read returned."""
+        if self._last_ns is not None and now_ns > self._last_ns:
+            sample     = n * 1e9 / (now_ns - self._last_ns)
+            self.rate += self.alpha * (sample - self.rate)
+        self._last_ns = now_ns
+
+    def size(self, waiting: int = 0) -> int:
+        fs   = self.frame_size
+        want = max(int(self.rate * self.target_s), waiting, fs)
+        return min(want - want % fs, self.max_size)
+
+
+def size_histogram(counts: list) -> str:
+    """Render power-of-two bucket counts (index = n.bit_length()) compactly."""
+    parts = [f"{1 << (k - 1)}-{(1 << k) - 1} B: {c}" for k, c in enumerate(counts) if c and k]
+    return ', '.join(parts) or 'none'
+
+
+# ── Columnar telemetry store ─────────────────────────────────────────────────
+
+class TelemetryStore:
+    """
+    In-process columnar store of decoded frames, filled in bulk by the
+    pipeline.  Every column (ts_ns first, then e.g. line, index and each
+    schema field) is a typed array written in chunks of chunk_rows rows;
+    a full chunk is sealed and a fresh one started, so appends never copy
+    what is already stored.
+
+    Rows arrive in time order, so a bisect over the chunks' first
+    timestamps plus np.searchsorted inside a chunk answers range and
+    point-in-time queries in O(log n).  Memory is bounded by max_chunks:
+    beyond it the oldest chunk is dropped or, with spill_dir, written to
+    spill_dir/chunk_NNNNNN/<column>.npy and memory-mapped back on demand.
+    A spill directory holds one run: a store will not spill into one that
+    already has chunks, and TelemetryStore.open() reopens it for queries.
+    """
+
+    def __init__(self, columns: dict, chunk_rows: int = STORE_CHUNK_ROWS,
+                 max_chunks: int = STORE_MAX_CHUNKS, spill_dir: str | None = None):
+        if 'ts_ns' not in columns:
+            raise ValueError("telemetry store needs a 'ts_ns' column")
+        self.columns    = {name: np.dtype(dt) for name, dt in columns.items()}
+        self.chunk_rows = chunk_rows
+        self.max_chunks = max_chunks
+        self.spill_dir  = spill_dir
+        self.rows       = 0
+        self.evicted    = 0          # rows dropped without a spill directory
+        self._chunks    = []         # sealed chunks: {column: array} or spill path
+        self._starts    = []         # first ts_ns of each sealed chunk
+        self._spilled   = 0          # leading chunks that live on disk
+        self._next_id   = 0
+        self._fill      = 0
+        self._active    = self._new_chunk()
+        if spill_dir is not None:
+            if self.spilled(spill_dir):
+                raise ValueError(f'{spill_dir}: already holds spilled chunks')
+            os.makedirs(spill_dir, exist_ok=True)
+
+    @staticmethod
+    def spilled(spill_dir: str) -> list:
+        """Chunk directories under spill_dir, in spill order ([] if none)."""
+        if not os.path.isdir(spill_dir):
+            return []
+        return sorted(os.path.join(spill_dir, d) for d in os.listdir(spill_dir)
+                      if d.startswith('chunk_'))
+
+    @staticmethod
+    def schema_columns(schema=None) -> dict:
+        """
+        The pipeline's columns: ts_ns, line, index, then the schema fields.
+        A schema field named line or index replaces the built-in column;
+        one named ts_ns is rejected with ValueError.
+        """
+        columns = {'ts_ns': np.int64, 'line': np.uint8, 'index': np.int64}
+        if schema is not None:
+            for name, sc in zip(schema.names, schema.scales):
+                if name == 'ts_ns':
+                    raise ValueError(f"{schema.name}: field 'ts_ns' clashes with the store's "
+                                     f"timestamp column")
+                columns[name] = np.float64 if sc is not None else schema.dtype[name].newbyteorder('=')
+        return columns
+
+    @classmethod
+    def for_schema(cls, schema=None, **kwargs) -> 'TelemetryStore':
+        """Store for schema_columns(schema)."""
+        return cls(cls.schema_columns(schema), **kwargs)
+
+    @classmethod
+    def open(cls, spill_dir: str) -> 'TelemetryStore':
+        """Reopen the chunks spilled to spill_dir for querying."""
+        paths = cls.spilled(spill_dir)
+        if not paths:
+            raise ValueError(f'{spill_dir}: no spilled chunks')
+        columns = {f[:-4]: np.load(os.path.join(paths[0], f), mmap_mode='r').dtype
+                   for f in sorted(os.listdir(paths[0])) if f.endswith('.npy')}
+        store = cls(columns)
+        store.spill_dir = spill_dir
+        for path in paths:
+            ts = np.load(os.path.join(path, 'ts_ns.npy'), mmap_mode='r')
+            if len(ts):
+                store._chunks.append(path)
+                store._starts.append(int(ts[0]))
+                store.rows += len(ts)
+        if any(b < a for a, b in zip(store._starts, store._starts[1:])):
+            raise ValueError(f'{spill_dir}: chunk start times are out of order '
+                             f'(chunks from more than one run?)')
+        store._spilled = store._next_id = len(store._chunks)
+        return store
+
+    def _new_chunk(self) -> dict:
+        return {name: np.empty(self.chunk_rows, dtype=dt) for name, dt in self.columns.items()}
+
+    def append(self, cols: dict) -> None:
+        """Append equal-length arrays, one per column."""
+        n   = len(cols['ts_ns'])
+        pos = 0
+        while pos < n:
+            take = min(n - pos, self.chunk_rows - self._fill)
+            for name, arr in self._active.items():
+                arr[self._fill:self._fill + take] = cols[name][pos:pos + take]
+            self._fill += take
+            pos        += take
+            if self._fill == self.chunk_rows:
+                self._seal()
+        self.rows += n
+
+    def _seal(self) -> None:
+        if not self._fill:
+            return
+        chunk = self._active
+        if self._fill < self.chunk_rows:
+            chunk = {name: arr[:self._fill].copy() for name, arr in chunk.items()}
+        self._chunks.append(chunk)
+        self._starts.append(int(chunk['ts_ns'][0]))
+        self._active = self._new_chunk()
+        self._fill   = 0
+        if len(self._chunks) - self._spilled > self.max_chunks:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Spill (or drop) the oldest chunk still in memory."""
+        if self.spill_dir is None:
+            self.evicted += len(self._chunks[0]['ts_ns'])
+            del self._chunks[0], self._starts[0]
+            return
+        chunk = self._chunks[self._spilled]
+        path  = os.path.join(self.spill_dir, f'chunk_{self._next_id:06d}')
+        os.makedirs(path, exist_ok=True)
+        for name, arr in chunk.items():
+            np.save(os.path.join(path, f'{name}.npy'), arr)
+        self._chunks[self._spilled] = path
+        self._spilled += 1
+        self._next_id += 1
+
+    def close(self) -> None:
+        """Seal the partial chunk and, with a spill directory, spill everything."""
+        self._seal()
+        if self.spill_dir is not None:
+            while self._spilled < len(self._chunks):
+                self._evict()
+
+    def _segment(self, i: int) -> dict:
+        if i == len(self._chunks):
+            return {name: arr[:self._fill] for name, arr in self._active.items()}
+        chunk = self._chunks[i]
+        if isinstance(chunk, str):
+            return {name: np.load(os.path.join(chunk, f'{name}.npy'), mmap_mode='r')
+                    for name in self.columns}
+        return chunk
+
+    def _segment_starts(self) -> list:
+        if self._fill:
+            return self._starts + [int(self._active['ts_ns'][0])]
+        return self._starts
+
+    def query(self, t0: int, t1: int, columns=None) -> dict:
+        """Rows with t0 <= ts_ns < t1, oldest first, as {column: ndarray}."""
+        names  = columns or list(self.columns)
+        starts = self._segment_starts()
+        parts  = {name: [] for name in names}
+        # bisect_left: rows stamped t0 may end the chunk before one starting at t0.
+        for i in range(max(bisect.bisect_left(starts, t0) - 1, 0), len(starts)):
+            if starts[i] >= t1:
+                break
+            seg = self._segment(i)
+            lo, hi = np.searchsorted(seg['ts_ns'], (t0, t1), side='left')
+            if hi > lo:
+                for name in names:
+                    parts[name].append(seg[name][lo:hi])
+        return {name: np.concatenate(chunks) if chunks else np.empty(0, self.columns[name])
+                for name, chunks in parts.items()}
+
+    def at(self, t: int, columns=None) -> dict | None:
+        """The latest row with ts_ns <= t, or None if t precedes the store."""
+        i = bisect.bisect_right(self._segment_starts(), t) - 1
+        if i < 0:
+            return None
+        seg = self._segment(i)
+        k   = int(np.searchsorted(seg['ts_ns'], t, side='right')) - 1
+        return {name: seg[name][k].item() for name in columns or self.columns}
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held in memory (active chunk included, spilled chunks not)."""
+        resident = self._chunks[self._spilled:] + [self._active]
+        return sum(arr.nbytes for chunk in resident for arr in chunk.values())
+
+    def summary(self) -> str:
+        return (f"{self.rows} row(s) x {len(self.columns)} column(s), "
+                f"{len(self._chunks) - self._spilled} chunk(s) in memory "
+                f"({self.nbytes / 2**20:.1f} MiB), {self._spilled} spilled, "
+                f"{self.evicted} row(s) evicted")
+
+
+# ── Pipeline ─────────────────────────────────────────────────────────────────
+
+class Pipeline:
+    """
+    Consumer stage shared by every reader mode: frame sync, sequence
+    checking and display.  Readers only hand raw chunks to feed().
+
+    With display=False every frame is still synchronised and sequence
+    checked, but display_all() is skipped.  With a stats interval set, a
+    one-line throughput / integrity summary is printed once per interval;
+    readers call tick() when idle so the summary keeps coming without data.
+    An optional DisplaySampler renders only a subset of the frames.
+
+    frame_format 'word' tracks byte 0 of each frame as one counter; 'tagged'
+    and the compact formats keep a separate counter per line channel, so
+    self.seq is then a LineTrackers.  Compact frames also feed each line's
+    edge intervals into self.periods (line -> IntervalStats).
+    """
+
+    def __init__(self, display: bool = True, stats_interval: float | None = None,
+                 sampler: DisplaySampler | None = None, frame_format: str = 'word'):
+        frame_size, check   = FRAME_FORMATS[frame_format]
+        self.frame_format   = frame_format
+        self.sync           = FrameSync(frame_size, check)
+        if frame_format == 'word':
+            self.seq = SequenceTracker()
+        elif frame_format == 'tagged':
+            self.seq = LineTrackers()
+        else:
+            self.seq = LineTrackers(1 << (8 * COMPACT_DTYPES[frame_format]['seq'].itemsize))
+        self.periods        = {}
+        self.display        = display
+        self.sampler        = sampler
+        self.stats_interval = stats_interval
+        self.chunks         = 0
+        self.packet_no      = 0
+        self.byte_total     = 0
+        self.ring           = None   # set by thread_reader()
+        self.pool           = None   # BufferPool, set by poll / async readers
+        self.sizer          = None   # ReadSizer, set by adaptive_reader()
+        self.read_calls     = 0      # read syscalls made by the reader
+        self.chunk_sizes    = [0] * 33   # histogram by n.bit_length()
+        self.recorder       = None   # CaptureWriter, set by main()
+        self.text           = None   # LineAssembler, set by main() for --text
+        self.schema         = None   # PacketSchema, set by main() for --schema
+        self.store          = None   # TelemetryStore, set by main() for --store
+        self.timing         = None   # TimingLog, set by main()
+        self._max_read      = 0      # largest chunk in the current interval
+        self._last          = (time.monotonic(), 0, 0, 0)
+
+    def feed(self, chunk, ts_ns: int | None = None) -> None:
+        """Process one raw chunk; ts_ns is its CLOCK_MONOTONIC arrival time."""
+        ts_ns = self.account(chunk, ts_ns)
+        if self.text is not None:
+            self.show_lines(self.text.feed(chunk))
+        else:
+            self.process(self.sync.feed(chunk), ts_ns)
+        if self.stats_interval:
+            self.tick()
+
+    def account(self, chunk, ts_ns: int | None = None) -> int | None:
+        """
+        Byte counters, chunk histogram and capture for one raw chunk.
+        Returns ts_ns, stamped now if a recorder or timing log needs one.
+        """
+        n = len(chunk)
+        self.chunks     += 1
+        self.byte_total += n
+        self.chunk_sizes[n.bit_length()] += 1
+        if n > self._max_read:
+            self._max_read = n
+        if ts_ns is None and (self.recorder is not None or self.timing is not None
+                              or self.store is not None):
+            ts_ns = time.monotonic_ns()
+        if self.recorder is not None:
+            self.recorder.append(chunk, ts_ns)
+        return ts_ns
+
+    def process(self, frames, ts_ns: int | None = None, bodies=None) -> None:
+        """
+        Sequence-check, log and display synchronised frames.  bodies, if
+        given, holds each frame's format_body() text already rendered (by
+        the decode farm) and is printed under a fresh header.
+        """
+        first   = self.packet_no
+        schema  = self.schema
+        store   = self.store
+        columns = None          # decode_columns(frames), built on first display
+        if store is not None:
+            line_col, index_col = [], []
+        line    = 0
+        lines   = self.seq if self.frame_format != 'word' else None
+        compact = COMPACT_STRUCTS.get(self.frame_format)
+        unpack  = compact.unpack if compact is not None else None
+        periods = self.periods
+        seq     = self.seq
+        sampler = self.sampler
+        timing  = self.timing
+        for frame in frames:
+            self.packet_no += 1
+            if lines is None:
+                value = frame[0]
+            elif unpack is None:
+                line       = frame[0] & 0x0F
+                seq, value = lines.tracker(line), frame[1]
+            else:
+                _, line, _, value, dt_us, _ = unpack(frame)
+                seq = lines.tracker(line)
+                if dt_us:                       # 0 on a line's first edge
+                    period = periods.get(line)
+                    if period is None:
+                        period = periods[line] = IntervalStats()
+                    period.add(dt_us)
+            dups = seq.duplicates
+            gap  = seq.update(value)
+            if timing is not None:
+                timing.log(seq.index, line, value, ts_ns)
+            if store is not None:
+                line_col.append(line)
+                index_col.append(seq.index)
+            if not self.display:
+                continue
+            if sampler is None or sampler(self.packet_no, gap or seq.duplicates != dups):
+                if schema is not None:
+                    print(f"  Packet #{self.packet_no:>6}  |  {format_fields(schema.unpack(frame))}")
+                elif bodies is None:
+                    if columns is None:
+                        columns = decode_columns(frames)
+                    k = self.packet_no - first - 1
+                    print(format_header(self.packet_no, len(frame)))
+                    print(format_body(frame, {label: col[k] for label, col in columns.items()}))
+                else:
+                    print(format_header(self.packet_no, len(frame)))
+                    print(bodies[self.packet_no - first - 1])
+
+        if store is not None and index_col:
+            cols = {'ts_ns': np.full(len(index_col), ts_ns, dtype=np.int64),
+                    'line':  np.array(line_col, dtype=np.uint8),
+                    'index': np.array(index_col, dtype=np.int64)}
+            if schema is not None:
+                cols.update(schema.decode(b''.join(frames)))
+            store.append(cols)
+
+    def close(self) -> None:
+        """
+        Close the recorder, timing log and store.  A CaptureError from the
+        recorder is raised after the others are closed.
+        """
+        error = None
+        if self.recorder is not None:
+            try:
+                self.recorder.close()
+            except CaptureError as exc:
+                error = exc
+        if self.timing is not None:
+            self.timing.close()
+        if self.store is not None:
+            self.store.close()
+        if error is not None:
+            raise error
+
+    def show_lines(self, lines: list) -> None:
+        """Text mode: count whole lines as packets and print them."""
+        for line in lines:
+            self.packet_no += 1
+            if self.display:
+                print(f"  Line #{self.packet_no:>6}  |  {line}")
+
+    def tick(self) -> None:
+        """Print the interval summary if the stats interval has elapsed."""
+        if not self.stats_interval:
+            return
+        now = time.monotonic()
+        t0, bytes0, frames0, dropped0 = self._last
+        elapsed = now - t0
+        if elapsed < self.stats_interval:
+            return
+
+        print(f"[stats] {(self.byte_total - bytes0) / elapsed:>10,.0f} B/s  "
+              f"{(self.packet_no - frames0) / elapsed:>9,.0f} frames/s  "
+              f"drops {self.seq.dropped - dropped0:>5}  "
+              f"max read {self._max_read:>5} B")
+        self._max_read = 0
+        self._last     = (now, self.byte_total, self.packet_no, self.seq.dropped)
+
+    def report(self) -> None:
+        print(f"Stopped.  Packets received: {self.packet_no}  |  Total bytes: {self.byte_total}")
+        if self.text is not None:
+            print(f"Text          : {self.text.summary()}")
+        else:
+            print(f"Frame sync    : {self.sync.resyncs} resync(s), {self.sync.slipped} byte(s) skipped")
+            print(f"Sequence      : {self.seq.summary()}")
+        for line in sorted(self.periods):
+            print(f"Edge period   : line {line}: {self.periods[line].summary()}")
+        if self.recorder is not None:
+            print(f"Capture       : {self.recorder.summary()}")
+        if self.timing is not None:
+            print(f"Timing log    : {self.timing.frames} frame(s) -> {self.timing.path}")
+        if self.store is not None:
+            print(f"Store         : {self.store.summary()}")
+        if self.display and self.sampler is not None:
+            print(f"Display       : {self.sampler.rendered} rendered, {self.sampler.skipped} skipped")
+        if self.chunks:
+            print(f"Chunk sizes   : {size_histogram(self.chunk_sizes)}")
+        if self.read_calls:
+            print(f"Read calls    : {self.read_calls} ({self.read_calls / max(self.chunks, 1):.2f} per chunk)")
+        if self.sizer is not None:
+            print(f"Read sizing   : target {self.sizer.target_s * 1e6:.0f} us, "
+                  f"rate {self.sizer.rate:,.0f} B/s, next read {self.sizer.size()} B")
+        if self.pool is not None:
+            print(f"Buffer pool   : {self.pool.summary()}")
+        if self.ring is not None:
+            print(f"Ring buffer   : high-water {self.ring.high_water}/{self.ring.size} bytes, "
+                  f"{self.ring.overflows} overflow(s), {self.ring.overflow_bytes} byte(s) dropped")
+
 
+# ── Readers ──────────────────────────────────────────────────────────────────
+
+def readv_ready(fd: int, buffers) -> int:
+    """
+    os.readv() on an fd that select/epoll just reported readable.  pyserial
+    opens the port O_NONBLOCK with VMIN=1, so an empty queue raises
+    BlockingIOError; 0 bytes means the device went away (a pulled USB
+    adapter, say), which is raised the way pyserial's own read() does.
+    """
+    n = os.readv(fd, buffers)
+    if not n:
+        raise serial.SerialException('device reports readiness to read but returned no data '
+                                     '(device disconnected or multiple access on port?)')
+    return n
+
+
+def poll_reader(ser: serial.Serial, pipeline: Pipeline) -> None:
+    """
+    Blocking reader: poll in_waiting, or wait up to TIMEOUT_S for the first
+    byte, then read everything queued in one call straight into a pooled
+    buffer.  The pipeline gets a memoryview of it; nothing is copied.
+    """
+    fd   = ser.fileno()
+    pool = pipeline.pool = BufferPool(1)
+
+    while True:
+        waiting = ser.in_waiting
+        if waiting == 0:
+            if not select.select([fd], [], [], TIMEOUT_S)[0]:
+                pipeline.tick()
+                continue
+            waiting = ser.in_waiting or 1
+
+        buf = pool.acquire()
+        n   = readv_ready(fd, [memoryview(buf)[:min(waiting, pool.size)]])
+        pipeline.read_calls += 1
+        pipeline.feed(memoryview(buf)[:n], time.monotonic_ns())
+        pool.release(buf)
+
+
+def adaptive_reader(ser: serial.Serial, pipeline: Pipeline,
+                    target_s: float = LATENCY_TARGET_S) -> None:
+    """
+    Adaptive reader: each read asks a ReadSizer how many bytes to collect,
+    then fills one reusable buffer with os.readv() until it has them or
+    target_s has passed since the first byte arrived, sleeping for the
+    expected fill time between reads.  An idle line blocks for up to
+    TIMEOUT_S waiting for that first byte.
+    """
+    fd    = ser.fileno()
+    view  = memoryview(bytearray(MAX_CHUNK))
+    sizer = pipeline.sizer = ReadSizer(target_s, pipeline.sync.frame_size)
+
+    while True:
+        want     = sizer.size(ser.in_waiting)
+        filled   = 0
+        deadline = None
+        lost     = None
+        while filled < want:
+            timeout = TIMEOUT_S if deadline is None else deadline - time.monotonic()
+            if timeout <= 0 or not select.select([fd], [], [], timeout)[0]:
+                break
+            try:
+                n = readv_ready(fd, [view[filled:want]])
+            except serial.SerialException as exc:
+                lost = exc                  # feed what we have, then stop
+                break
+            pipeline.read_calls += 1
+            filled += n
+            if deadline is None:
+                deadline = time.monotonic() + target_s
+            if filled < want and sizer.rate:
+                # Sleep until the rest should be here rather than waking for
+                # every few bytes.
+                time.sleep(max(0.0, min((want - filled) / sizer.rate,
+                                        deadline - time.monotonic())))
+
+        now = time.monotonic_ns()
+        sizer.observe(filled, now)
+        if filled:
+            pipeline.feed(view[:filled], now)
+        else:
+            pipeline.tick()
+        if lost is not None:
+            raise lost
+
+
+async def stats_task(pipeline: Pipeline) -> None:
+    """Keep interval stats flowing in async mode even when the line is idle."""
+    while True:
+        await asyncio.sleep(pipeline.stats_interval)
+        pipeline.tick()
+
+
+async def async_reader(ser: serial.Serial, pipeline: Pipeline, tasks=()) -> None:
+    """
+    Event-loop reader.  The UART fd is registered with loop.add_reader();
+    each readiness event drains everything available into a buffer from a
+    BufferPool and queues a (timestamp, buffer, length) for a consumer
+    coroutine, which releases the buffer after feeding it.  A disconnect
+    found by the callback is queued behind the data and raised by the
+    consumer.  When the pool
+    is empty the fd is unregistered until the consumer catches up, leaving
+    the data in the kernel buffer.  Extra coroutines in `tasks` (stats,
+    uplink, ...) run in the same loop and are cancelled when the reader stops.
+    """
+    loop   = asyncio.get_running_loop()
+    fd     = ser.fileno()
+    pool   = pipeline.pool = BufferPool(ASYNC_QUEUE)
+    chunks = asyncio.Queue()
+    paused = False
+
+    def on_readable() -> None:
+        nonlocal paused
+        buf = pool.acquire(block=False)
+        if buf is None:
+            loop.remove_reader(fd)
+            paused = True
+            return
+        view   = memoryview(buf)
+        filled = 0
+        lost   = None
+        while filled < len(view):
+            try:
+                n = readv_ready(fd, [view[filled:]])
+            except BlockingIOError:         # O_NONBLOCK: drained
+                break
+            except serial.SerialException as exc:
+                loop.remove_reader(fd)
+                lost = exc
+                break
+            pipeline.read_calls += 1
+            filled += n
+        if filled:
+            chunks.put_nowait((time.monotonic_ns(), buf, filled))
+        else:
+            pool.release(buf)
+        if lost is not None:
+            chunks.put_nowait(lost)
+
+    async def consume() -> None:
+        nonlocal paused
+        while True:
+            item = await chunks.get()
+            if isinstance(item, serial.SerialException):
+                raise item
+            ts_ns, buf, n = item
+            pipeline.feed(memoryview(buf)[:n], ts_ns)
+            pool.release(buf)
+            if paused and pool.count - pool.in_use >= pool.count // 2:
+                loop.add_reader(fd, on_readable)
+                paused = False
+
+    loop.add_reader(fd, on_readable)
+    extra = [asyncio.create_task(t) for t in tasks]
     try:
-        ser = serial.Serial(
-            port=UART_PORT,
-            baudrate=BAUD_RATE,
+        await consume()
+    finally:
+        loop.remove_reader(fd)
+        for task in extra:
+            task.cancel()
+
+
+def ring_producer(ser: serial.Serial, ring: RingBuffer, pipeline: Pipeline,
+                  ready: threading.Event, stop: threading.Event) -> None:
+    """Reader thread: move bytes from the UART fd straight into the ring."""
+    fd      = ser.fileno()
+    scratch = memoryview(bytearray(MAX_CHUNK))
+
+    while not stop.is_set():
+        if not select.select([fd], [], [], TIMEOUT_S)[0]:
+            continue
+        spans = ring.write_spans()
+        if spans:
+            n = readv_ready(fd, spans)
+            ring.commit(n, time.monotonic_ns())
+            pipeline.read_calls += 1
+        else:
+            # Ring full: keep draining the tty so the kernel buffer never
+            # overflows, and account for what we had to throw away.
+            n = readv_ready(fd, [scratch])
+            ring.overflows      += 1
+            ring.overflow_bytes += n
+        ready.set()
+
+
+def ring_consumer(ring: RingBuffer, pipeline: Pipeline,
+                  ready: threading.Event, stop: threading.Event) -> None:
+    """
+    Consumer thread: decode and display whatever the producer committed,
+    including what is still in the ring when the producer stops.
+    """
+    while not stop.is_set():
+        if not ready.wait(TIMEOUT_S):
+            pipeline.tick()
+        ready.clear()
+        _drain_ring(ring, pipeline)
+    _drain_ring(ring, pipeline)
+
+
+def _drain_ring(ring: RingBuffer, pipeline: Pipeline) -> None:
+    spans = ring.read_spans()
+    ts_ns = ring.commit_ns              # newest arrival covered by the spans
+    for span in spans:
+        pipeline.feed(span, ts_ns)
+        ring.release(len(span))
+
+
+def _guarded(target, errors: list):
+    """Thread target that records the exception ending `target` in `errors`."""
+    def run(*args):
+        try:
+            target(*args)
+        except Exception as exc:
+            errors.append(exc)
+    return run
+
+
+def thread_reader(ser: serial.Serial, pipeline: Pipeline) -> None:
+    """
+    Decoupled reader: one thread only copies UART bytes into a RingBuffer,
+    another runs the pipeline, so a slow terminal cannot stall the reads.
+    """
+    ring   = pipeline.ring = RingBuffer()
+    ready  = threading.Event()
+    stop   = threading.Event()
+    errors = []
+    threads = [
+        threading.Thread(target=_guarded(ring_producer, errors),
+                         args=(ser, ring, pipeline, ready, stop),
+                         name='uart-reader', daemon=True),
+        threading.Thread(target=_guarded(ring_consumer, errors),
+                         args=(ring, pipeline, ready, stop),
+                         name='uart-consumer', daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while all(thread.is_alive() for thread in threads):
+            threads[0].join(TIMEOUT_S)
+    finally:
+        stop.set()
+        ready.set()
+        for thread in threads:
+            thread.join()
+    if errors:
+        raise errors[0]
+
+
+# ── Multiprocess decode farm ─────────────────────────────────────────────────
+
+_farm_blocks = []        # worker process: attached shared-memory blocks
+
+
+def _farm_init(names: list) -> None:
+    """Worker initializer: attach every block once; Ctrl+C is the parent's."""
+    global _farm_blocks
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _farm_blocks = [shared_memory.SharedMemory(name=name) for name in names]
+
+
+def _farm_decode(slot: int, length: int, prefix: int, frame_format: str,
+                 display: bool) -> tuple:
+    """
+    Worker: frame-sync one block from scratch and render the frame bodies.
+    Returns (frames as one bytes object, bodies or None, resyncs, slipped).
+    """
+    size, check = FRAME_FORMATS[frame_format]
+    buf    = np.frombuffer(_farm_blocks[slot].buf, dtype=np.uint8, count=length)
+    sync   = FrameSync(size, check)
+    starts = np.asarray(sync._scan(buf, 0, length)[0], dtype=np.intp)
+    frames = buf[starts[:, None] + np.arange(size)].tobytes()
+    del buf
+
+    # Prefix bytes ahead of the first frame belong to the previous block's
+    # frames, not to a slip.
+    lead    = int(starts[0]) if starts.size else length
+    slipped = sync.slipped - min(lead, prefix)
+
+    bodies = None
+    if display:
+        mv      = memoryview(frames)
+        packets = [mv[i:i + size] for i in range(0, len(frames), size)]
+        columns = decode_columns(packets)
+        bodies  = [format_body(packet, {label: col[k] for label, col in columns.items()})
+                   for k, packet in enumerate(packets)]
+    return frames, bodies, sync.resyncs, slipped
+
+
+def farm_reader(ser: serial.Serial, pipeline: Pipeline, workers: int = FARM_WORKERS) -> None:
+    """
+    Decode farm for multi-core boards.  This process only reads: bytes go
+    straight into shared-memory blocks, each starting with the last
+    frame_size - 1 bytes of the one before so a frame straddling two blocks
+    is complete in the second and in no other.  A block is dispatched when
+    full or FARM_FLUSH_S after its first byte to a pool of worker processes
+    that run frame sync, decoding and formatting.  A merger thread takes the
+    results in block order and hands them to pipeline.process(), which
+    numbers the packets, tracks sequences and prints.  If the merger fails
+    (a broken worker pool, say) reading stops and its error is re-raised.
+    """
+    fd       = ser.fileno()
+    fs       = pipeline.sync.frame_size
+    over     = fs - 1
+    capacity = FARM_BLOCK + over
+    slots    = 2 * workers + 2
+    blocks   = [shared_memory.SharedMemory(create=True, size=capacity) for _ in range(slots)]
+    free     = queue.SimpleQueue()
+    results  = queue.SimpleQueue()       # (slot, ts_ns, future) in dispatch order
+    errors   = []
+    # With a schema the pipeline prints schema fields, not frame bodies.
+    render   = pipeline.display and pipeline.schema is None
+    for slot in range(slots):
+        free.put(slot)
+
+    def merge() -> None:
+        while True:
+            try:
+                item = results.get(timeout=TIMEOUT_S)
+            except queue.Empty:
+                pipeline.tick()
+                continue
+            if item is None:
+                return
+            slot, ts_ns, future = item
+            frames, bodies, resyncs, slipped = future.result()
+            free.put(slot)
+            pipeline.sync.frames  += len(frames) // fs
+            pipeline.sync.resyncs += resyncs
+            pipeline.sync.slipped += slipped
+            mv = memoryview(frames)
+            pipeline.process([mv[i:i + fs] for i in range(0, len(frames), fs)], ts_ns, bodies)
+            if pipeline.stats_interval:
+                pipeline.tick()
+
+    pool   = ProcessPoolExecutor(workers, initializer=_farm_init,
+                                 initargs=([block.name for block in blocks],))
+    merger = threading.Thread(target=_guarded(merge, errors), name='farm-merger', daemon=True)
+    merger.start()
+    tail = b''
+
+    try:
+        while merger.is_alive():
+            try:
+                slot = free.get(timeout=TIMEOUT_S)
+            except queue.Empty:
+                continue
+            view   = blocks[slot].buf
+            prefix = len(tail)
+            view[:prefix] = tail
+            filled   = prefix
+            deadline = None
+            ts_ns    = 0
+            lost     = None
+            while filled < capacity and merger.is_alive():
+                timeout = TIMEOUT_S if deadline is None else deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                if not select.select([fd], [], [], timeout)[0]:
+                    continue
+                try:
+                    # Released even if the read raises, so the blocks can close.
+                    with view[filled:capacity] as span:
+                        n = readv_ready(fd, [span])
+                except serial.SerialException as exc:
+                    lost = exc              # dispatch what we have, then stop
+                    break
+                pipeline.read_calls += 1
+                ts_ns = pipeline.account(view[filled:filled + n], time.monotonic_ns())
+                filled += n
+                if deadline is None:
+                    deadline = time.monotonic() + FARM_FLUSH_S
+            if filled == prefix:
+                free.put(slot)
+            else:
+                tail = bytes(view[max(0, filled - over):filled])
+                future = pool.submit(_farm_decode, slot, filled, prefix,
+                                     pipeline.frame_format, render)
+                results.put((slot, ts_ns, future))
+            if lost is not None:
+                raise lost
+    finally:
+        results.put(None)
+        merger.join()
+        pool.shutdown()
+        for block in blocks:
+            block.close()
+            block.unlink()
+        if errors:
+            print(f"[ERROR] Decode farm failed: {errors[0]!r}", file=sys.stderr)
+    if errors:
+        raise errors[0]
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description='Read and decode tm_fast telemetry from the UART.')
+    ap.add_argument('--port', default=UART_PORT,
+                    help=f'serial device (default {UART_PORT})')
+    ap.add_argument('--baud', type=int, default=BAUD_RATE,
+                    help=f'baud rate (default {BAUD_RATE})')
+    ap.add_argument('--mode', choices=('poll', 'async', 'thread', 'adaptive', 'farm'),
+                    default='poll',
+                    help='reader: blocking in_waiting poll (default), asyncio event loop, '
+                         'reader thread + ring buffer + consumer thread, reads sized '
+                         'from the arrival rate, or multiprocess decode farm')
+    ap.add_argument('--workers', type=int, default=FARM_WORKERS, metavar='N',
+                    help=f'farm mode: decode worker processes (default {FARM_WORKERS})')
+    ap.add_argument('--latency-target-us', type=float, default=LATENCY_TARGET_S * 1e6,
+                    metavar='US',
+                    help='adaptive mode: longest wait for a fuller read; lower favours '
+                         f'latency, higher fewer reads (default {LATENCY_TARGET_S * 1e6:g})')
+    ap.add_argument('--format', choices=tuple(FRAME_FORMATS), default='word',
+                    help="tm_fast frame format (default 'word'): must match tm_fast --format")
+    ap.add_argument('--schema', metavar='FILE',
+                    help='decode frames with a JSON packet schema instead of showing '
+                         'every interpretation')
+    ap.add_argument('--store', action='store_true',
+                    help='keep decoded frames (and --schema fields) in a columnar '
+                         'store with time-indexed queries; needs --spill, which is '
+                         'where the run can be queried from')
+    ap.add_argument('--store-chunks', type=int, default=STORE_MAX_CHUNKS, metavar='N',
+                    help=f'store chunks of {STORE_CHUNK_ROWS} rows kept in memory '
+                         f'(default {STORE_MAX_CHUNKS})')
+    ap.add_argument('--spill', metavar='DIR',
+                    help='spill store chunks to DIR as they leave memory and all of them '
+                         'at exit; query with TelemetryStore.open(DIR) (implies --store)')
+    ap.add_argument('--text', action='store_true',
+                    help='treat the stream as UTF-8 text and print whole lines instead of frames')
+    ap.add_argument('--terminator', action='append', metavar='SEQ',
+                    help=r"text line terminator, escapes allowed (repeatable; default '\n')")
+    ap.add_argument('--quiet', action='store_true',
+                    help=f'skip display_all(); print a stats line every interval '
+                         f'(default {STATS_S:g} s)')
+    ap.add_argument('--stats-interval', type=float, metavar='S',
+                    help='print bytes/s, frames/s, drops and max read size every S seconds')
+    ap.add_argument('--sample-every', type=int, default=1, metavar='N',
+                    help='render only every Nth frame (all frames are still checked)')
+    ap.add_argument('--max-rate', type=int, metavar='K',
+                    help='render at most K frames per second')
+    ap.add_argument('--anomalies-only', action='store_true',
+                    help='render only frames that follow a sequence gap or duplicate')
+    ap.add_argument('--record', metavar='FILE',
+                    help='append every raw chunk with a timestamp to a binary capture file')
+    ap.add_argument('--fsync', default='never', metavar='POLICY',
+                    help="capture fsync policy: 'never' (default), 'block' or seconds between fsyncs")
+    ap.add_argument('--replay', metavar='FILE',
+                    help='feed a --record capture through the pipeline instead of the UART')
+    ap.add_argument('--realtime', action='store_true',
+                    help='replay at the recorded pace instead of as fast as possible')
+    ap.add_argument('--speed', type=float, default=1.0, metavar='X',
+                    help='pace multiplier for --realtime (default 1)')
+    ap.add_argument('--timing-log', metavar='FILE',
+                    help='write per-frame arrival/decode timestamps for latency_report.py')
+    args = ap.parse_args(argv)
+    if args.fsync not in ('never', 'block'):
+        try:
+            float(args.fsync)
+        except ValueError:
+            ap.error(f"--fsync: expected 'never', 'block' or seconds, got {args.fsync!r}")
+    if args.workers < 1:
+        ap.error('--workers: need at least 1')
+    if args.text and args.mode == 'farm':
+        ap.error('--text is not supported in farm mode')
+    if args.spill:
+        args.store = True
+    elif args.store:
+        # Nothing reads the in-memory store while the reader runs, so without
+        # a spill directory it would be thrown away unqueried at exit.
+        ap.error('--store: needs --spill DIR to keep the store for querying')
+    if args.store and args.text:
+        ap.error('--store applies to frames, not --text')
+    if args.spill and TelemetryStore.spilled(args.spill):
+        ap.error(f'--spill: {args.spill} already holds spilled chunks; use an empty directory')
+    if args.store_chunks < 1:
+        ap.error('--store-chunks: need at least 1')
+    if args.schema:
+        if args.text:
+            ap.error('--schema applies to frames, not --text')
+        try:
+            args.schema = PacketSchema.load(args.schema)
+        except (OSError, ValueError) as exc:
+            ap.error(f'--schema: {exc}')
+        if args.store:
+            try:
+                TelemetryStore.schema_columns(args.schema)
+            except ValueError as exc:
+                ap.error(f'--schema: {exc}')
+        if args.schema.size != FRAME_FORMATS[args.format][0]:
+            ap.error(f'--schema: {args.schema.name} describes {args.schema.size}-byte packets, '
+                     f'{args.format} frames are {FRAME_FORMATS[args.format][0]} bytes')
+    # unicode_escape reads its input as Latin-1: escape anything beyond it
+    # first so a literal '€' or 'é' survives alongside '\r\n'-style escapes.
+    args.terminator = [t.encode('latin-1', 'backslashreplace').decode('unicode_escape')
+                       for t in args.terminator or [r'\n']]
+    if not all(args.terminator):
+        ap.error('--terminator: must not be empty')
+    if args.quiet and args.stats_interval is None:
+        args.stats_interval = STATS_S
+    return args
+
+
+def open_uart(port: str = UART_PORT, baudrate: int = BAUD_RATE) -> serial.Serial:
+    try:
+        return serial.Serial(
+            port=port,
+            baudrate=baudrate,
             bytesize=serial.EIGHTBITS,
             parity=serial.PARITY_NONE,
             stopbits=serial.STOPBITS_ONE,
             timeout=TIMEOUT_S,
         )
     except serial.SerialException as exc:
-        print(f"[ERROR] Cannot open {UART_PORT}: {exc}", file=sys.stderr)
+        print(f"[ERROR] Cannot open {port}: {exc}", file=sys.stderr)
         sys.exit(1)
 
-    packet_no  = 0
-    byte_total = 0
 
-    try:
-        while True:
-            # Wait until at least 1 byte arrives
-            waiting = ser.in_waiting
-            if waiting == 0:
-                # Block briefly for the first byte, then re-check
-                raw = ser.read(1)
-                if not raw:
-                    continue
-                # Grab anything else that arrived while we waited
-                waiting = ser.in_waiting
-                if waiting:
-                    raw += ser.read(min(waiting, MAX_CHUNK - 1))
-            else:
-                raw = ser.read(min(waiting, MAX_CHUNK))
+def main() -> None:
+    args = parse_args()
 
-            if not raw:
-                continue
+    if args.replay:
+        pace = f"recorded pace x{args.speed:g}" if args.realtime else "as fast as possible"
+        print(f"Replaying     : {args.replay} ({pace})")
+    else:
+        print(f"Opening UART  : {args.port}")
+        print(f"Baud rate     : {args.baud}")
+        if args.mode == 'async':
+            print(f"Read mode     : asyncio fd readiness, drain up to {MAX_CHUNK} bytes "
+                  f"into {ASYNC_QUEUE} pooled buffers")
+        elif args.mode == 'thread':
+            print(f"Read mode     : reader thread -> {RING_SIZE}-byte ring -> consumer thread")
+        elif args.mode == 'farm':
+            print(f"Read mode     : decode farm, {args.workers} worker process(es), "
+                  f"{FARM_BLOCK}-byte shared-memory blocks")
+        elif args.mode == 'adaptive':
+            print(f"Read mode     : adaptive size, latency target {args.latency_target_us:g} us, "
+                  f"max {MAX_CHUNK} bytes")
+        else:
+            print(f"Read mode     : dynamic (in_waiting), max {MAX_CHUNK} bytes, pooled buffer")
+        print(f"Timeout       : {TIMEOUT_S} s")
+    if args.text:
+        print(f"Framing       : UTF-8 text lines, terminated by "
+              f"{' or '.join(map(repr, args.terminator))}")
+    else:
+        print(f"Framing       : {FRAME_FORMATS[args.format][0]}-byte {args.format} frames, "
+              f"resync on misalignment")
+    sampler = None
+    if args.quiet:
+        print(f"Display       : off (stats every {args.stats_interval:g} s)")
+    elif args.sample_every > 1 or args.max_rate or args.anomalies_only:
+        sampler = DisplaySampler(args.sample_every, args.max_rate, args.anomalies_only)
+        print(f"Display       : sampled (every {sampler.every}, "
+              f"max {args.max_rate or 'unlimited'}/s"
+              f"{', anomalies only' if args.anomalies_only else ''})")
+    if args.schema:
+        print(f"Schema        : {args.schema.name} ({', '.join(args.schema.names)})")
+    if args.store:
+        print(f"Store         : {args.store_chunks} x {STORE_CHUNK_ROWS} rows in memory, "
+              f"spill to {args.spill}")
+    if args.record:
+        print(f"Recording     : {args.record} (fsync {args.fsync})")
+    if args.timing_log:
+        print(f"Timing log    : {args.timing_log}")
+    print_separator('═')
+    print("Replaying capture... (Ctrl+C to stop)" if args.replay
+          else "Listening for data... (Ctrl+C to stop)")
+    print_separator('═')
 
-            packet_no  += 1
-            byte_total += len(raw)
-            display_all(raw, packet_no)
+    ser = None if args.replay else open_uart(args.port, args.baud)
+
+    pipeline = Pipeline(display=not args.quiet, stats_interval=args.stats_interval,
+                        sampler=sampler, frame_format=args.format)
+    try:
+        if args.record:
+            target = f"record to {args.record}"
+            pipeline.recorder = CaptureWriter(args.record, fsync=args.fsync)
+        if args.timing_log:
+            target = f"write timing log {args.timing_log}"
+            pipeline.timing = TimingLog(args.timing_log)
+        if args.store:
+            target = f"spill store chunks to {args.spill}"
+            pipeline.store = TelemetryStore.for_schema(args.schema, max_chunks=args.store_chunks,
+                                                       spill_dir=args.spill)
+    except (OSError, ValueError) as exc:
+        print(f"[ERROR] Cannot {target}: {exc}", file=sys.stderr)
+        if ser is not None:
+            ser.close()
+        pipeline.close()
+        sys.exit(1)
+    if args.text:
+        pipeline.text = LineAssembler(args.terminator)
+    pipeline.schema = args.schema
+
+    status = 0
+    try:
+        if args.replay:
+            try:
+                replay_capture(args.replay, pipeline, args.realtime, args.speed)
+            except (OSError, ValueError) as exc:
+                print(f"[ERROR] Cannot replay {args.replay}: {exc}", file=sys.stderr)
+                sys.exit(1)
+        elif args.mode == 'async':
+            tasks = [stats_task(pipeline)] if args.stats_interval else []
+            asyncio.run(async_reader(ser, pipeline, tasks))
+        elif args.mode == 'thread':
+            thread_reader(ser, pipeline)
+        elif args.mode == 'adaptive':
+            adaptive_reader(ser, pipeline, args.latency_target_us / 1e6)
+        elif args.mode == 'farm':
+            farm_reader(ser, pipeline, args.workers)
+        else:
+            poll_reader(ser, pipeline)
 
     except KeyboardInterrupt:
-        print_separator('═')
-        print(f"Stopped.  Packets received: {packet_no}  |  Total bytes: {byte_total}")
+        pass
+
+    except CaptureError as exc:
+        print(f"[ERROR] {exc}", file=sys.stderr)
+        status = 1
+
+    except serial.SerialException as exc:
+        print(f"[ERROR] Lost {args.port}: {exc}", file=sys.stderr)
+        status = 1
 
     finally:
-        if ser.is_open:
+        if ser is not None and ser.is_open:
             ser.close()
+        # The one place outputs are closed, so the report below sees final
+        # counts; a capture that fails on its last block is reported too.
+        try:
+            pipeline.close()
+        except CaptureError as exc:
+            print(f"[ERROR] {exc}", file=sys.stderr)
+            status = 1
+
+    print_separator('═')
+    pipeline.report()
+    if status:
+        sys.exit(status)
 
 
 if __name__ == '__main__':